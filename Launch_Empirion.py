@@ -1,16 +1,112 @@
-import json
-import time
+import os
+import sqlite3
 
-def load_memory():
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:
+    import json
+    _loads = json.loads
+
+    def _dumps(obj):
+        return json.dumps(obj).encode("utf-8")
+
+MEMORY_DB = "memory.db"
+LEGACY_MEMORY_FILE = "memory.json"
+
+_connection = None
+
+def _get_connection():
+    global _connection
+    if _connection is None:
+        _connection = sqlite3.connect(MEMORY_DB)
+        _connection.execute("PRAGMA journal_mode=WAL")
+        _connection.execute(
+            "CREATE TABLE IF NOT EXISTS reminders "
+            "(id INTEGER PRIMARY KEY AUTOINCREMENT, data TEXT NOT NULL)")
+        _connection.execute(
+            "CREATE TABLE IF NOT EXISTS preferences (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        # Other top-level memory keys, stored as one JSON value each
+        _connection.execute(
+            "CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+    return _connection
+
+def _encode(value):
+    return _dumps(value).decode("utf-8")
+
+def _load_legacy_memory():
+    """Read the pre-SQLite memory.json, if one is still around"""
     try:
-        with open("memory.json", "r") as f:
-            return json.load(f)
+        with open(LEGACY_MEMORY_FILE, "rb") as f:
+            return _loads(f.read())
     except FileNotFoundError:
         return {}
+    except ValueError:
+        print("Memory file is corrupt, starting fresh.")
+        return {}
+
+def load_memory():
+    if not os.path.exists(MEMORY_DB):
+        # First run on SQLite: migrate the old JSON memory if present
+        memory = _load_legacy_memory()
+        if memory:
+            save_memory(memory)
+        return memory
+
+    conn = _get_connection()
+    reminders = [_loads(data) for (data,) in
+                 conn.execute("SELECT data FROM reminders ORDER BY id")]
+    preferences = {key: _loads(value) for key, value in
+                   conn.execute("SELECT key, value FROM preferences")}
+    memory = {"reminders": reminders, "preferences": preferences}
+    memory.update((key, _loads(value)) for key, value in conn.execute("SELECT key, value FROM kv"))
+    return memory
 
 def save_memory(memory):
-    with open("memory.json", "w") as f:
-        json.dump(memory, f)
+    """Replace everything stored with memory, for migration and bulk rewrites"""
+    # Day-to-day changes go through the single-row functions below
+    conn = _get_connection()
+    with conn:
+        conn.execute("DELETE FROM reminders")
+        conn.execute("DELETE FROM preferences")
+        conn.execute("DELETE FROM kv")
+        conn.executemany("INSERT INTO reminders (data) VALUES (?)",
+                         [(_encode(r),) for r in memory.get("reminders", [])])
+        conn.executemany("INSERT INTO preferences (key, value) VALUES (?, ?)",
+                         [(k, _encode(v)) for k, v in memory.get("preferences", {}).items()])
+        conn.executemany("INSERT INTO kv (key, value) VALUES (?, ?)",
+                         [(k, _encode(v)) for k, v in memory.items()
+                          if k not in ("reminders", "preferences")])
+
+def add_reminder(reminder):
+    """Append a single reminder without rewriting the others, returning its id"""
+    conn = _get_connection()
+    with conn:
+        return conn.execute("INSERT INTO reminders (data) VALUES (?)",
+                            (_encode(reminder),)).lastrowid
+
+def update_reminder(reminder_id, reminder):
+    """Replace one reminder in place; returns False if there is no such id"""
+    conn = _get_connection()
+    with conn:
+        return conn.execute("UPDATE reminders SET data = ? WHERE id = ?",
+                            (_encode(reminder), reminder_id)).rowcount > 0
+
+def remove_reminder(reminder_id):
+    """Delete one reminder; returns False if there is no such id"""
+    conn = _get_connection()
+    with conn:
+        return conn.execute("DELETE FROM reminders WHERE id = ?", (reminder_id,)).rowcount > 0
+
+def set_preference(key, value):
+    """Store a single preference without rewriting the others"""
+    conn = _get_connection()
+    with conn:
+        conn.execute(
+            "INSERT INTO preferences (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, _encode(value)))
 
 def main():
     print("Empirion AI Assistant is starting...")
@@ -30,7 +126,6 @@ def main():
                 break
             else:
                 print(f"Echo: {cmd}")
-            time.sleep(0.5)
     except KeyboardInterrupt:
         print("Shutting down Empirion.")
 
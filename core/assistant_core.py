@@ -1,79 +1,177 @@
 import asyncio
 import json
 import logging
+import time
+from collections import OrderedDict, deque
 from datetime import datetime
-from typing import Dict, Any, Optional, List
-import openai
-from dataclasses import dataclass, asdict
-import threading
-from queue import Queue
+from functools import partial
+from types import MappingProxyType
+from typing import Dict, Any, Optional, List, Deque, Mapping, Iterable, Tuple, Callable
+from core.clock import iso_now
+from core.intent import classify_intent
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Conversation turns kept per user; older turns are dropped on append
+MAX_CONVERSATION_HISTORY = 100
+
+# (epoch seconds, request, response)
+HistoryEntry = Tuple[float, Dict[str, Any], Dict[str, Any]]
+
+# User contexts kept in memory before the least recently active is evicted
+MAX_CONTEXTS = 10000
+
+# AI replies kept in the general-query LRU cache
+RESPONSE_CACHE_SIZE = 1024
+
+# Request metadata keys that update the user context
+_CONTEXT_KEYS = frozenset({'location', 'current_app', 'device_state'})
+
+# Static capability table shared by every AssistantCore instance
+_CAPABILITIES = MappingProxyType({
+    'voice_commands': True,
+    'phone_control': True,
+    'app_management': True,
+    'notifications': True,
+    'media_control': True,
+    'smart_home': True,
+    'web_search': True,
+    'calendar_management': True,
+    'messaging': True,
+    'navigation': True,
+    'translation': True,
+    'reminders': True,
+    'notes': True,
+    'weather': True,
+    'news': True,
+    'samsung_store': True,
+    'security': True,
+    'system_optimization': True,
+    'health_tracking': True,
+    'finance': True
+})
+
+_DEFAULT_PREFERENCES = MappingProxyType({
+    'language': 'en',
+    'voice_enabled': True,
+    'notifications_enabled': True,
+    'theme': 'auto'
+})
+
+# Static prompt prefix for general queries. Keeping it byte-identical on
+# every call lets the provider's prompt cache reuse it; only the user
+# message varies.
+_SYSTEM_MESSAGE = {"role": "system", "content": "You are a helpful mobile AI assistant."}
+
 class AssistantContext:
     """Maintains conversation context and user state"""
-    user_id: str
-    conversation_history: List[Dict[str, str]]
-    current_app: Optional[str] = None
-    location: Optional[Dict[str, float]] = None
-    device_state: Dict[str, Any] = None
-    preferences: Dict[str, Any] = None
-    active_features: List[str] = None
-    
-    def __post_init__(self):
-        if self.conversation_history is None:
-            self.conversation_history = []
-        if self.device_state is None:
-            self.device_state = {}
-        if self.preferences is None:
-            self.preferences = {}
-        if self.active_features is None:
-            self.active_features = []
+    
+    # Slots instead of a per-instance __dict__: one context exists per user
+    __slots__ = ('user_id', 'conversation_history', 'current_app', 'location',
+                 'device_state', 'preferences', 'active_features')
+    
+    def __init__(self, user_id: str,
+                 conversation_history: Optional[Iterable[HistoryEntry]] = None,
+                 current_app: Optional[str] = None,
+                 location: Optional[Dict[str, float]] = None,
+                 device_state: Optional[Dict[str, Any]] = None,
+                 preferences: Optional[Dict[str, Any]] = None,
+                 active_features: Optional[List[str]] = None):
+        self.user_id = user_id
+        self.conversation_history: Deque[HistoryEntry] = deque(
+            conversation_history or (), maxlen=MAX_CONVERSATION_HISTORY)
+        self.current_app = current_app
+        self.location = location
+        self.device_state = device_state if device_state is not None else {}
+        self.preferences = preferences if preferences is not None else {}
+        self.active_features = active_features if active_features is not None else []
+    
+    def history_as_dicts(self) -> List[Dict[str, Any]]:
+        """Return the conversation history as dicts, oldest first"""
+        return [
+            {
+                'timestamp': datetime.fromtimestamp(ts).isoformat(),
+                'request': request,
+                'response': response
+            }
+            for ts, request, response in self.conversation_history
+        ]
 
 class AssistantCore:
     """Core AI Assistant Engine with advanced capabilities"""
     
     def __init__(self, config: Dict[str, Any]):
         self.config = config
-        self.contexts: Dict[str, AssistantContext] = {}
-        self.command_queue = Queue()
-        self.response_queue = Queue()
+        # Per-user contexts in LRU order; the least recently active user is
+        # dropped once max_contexts is exceeded
+        self.contexts: "OrderedDict[str, AssistantContext]" = OrderedDict()
+        self.max_contexts = config.get('max_contexts', MAX_CONTEXTS)
+        # Only touched from the event loop thread, so no locking is needed
+        self.command_queue: Deque[Dict[str, Any]] = deque()
+        self.response_queue: Deque[Dict[str, Any]] = deque()
         self.capabilities = self._initialize_capabilities()
         self.is_running = False
+        # Bumped whenever get_status() would change; on_state_change is called after each bump
+        self.stats_version = 0
+        self.on_state_change: Optional[Callable[[], None]] = None
         
-        # Initialize OpenAI if API key is provided
-        if config.get('openai_api_key'):
-            openai.api_key = config['openai_api_key']
+        # Request type -> handler, all taking (context, content, metadata)
+        self._request_handlers = {
+            'voice': self._process_voice_command,
+            'text': self._process_text_request,
+            'action': self._process_action,
+            'system': self._process_system_command
+        }
+        
+        # Intent -> handler for text commands
+        self._intent_handlers = {
+            'phone_call': self._handle_phone_call,
+            'send_message': self._handle_send_message,
+            'open_app': self._handle_open_app,
+            'set_reminder': self._handle_set_reminder,
+            'play_media': self._handle_play_media,
+            'search_web': self._handle_web_search,
+            'control_device': self._handle_device_control,
+            'samsung_store': self._handle_samsung_store,
+            'system_setting': self._handle_system_setting,
+            'general_query': self._handle_general_query
+        }
+        
+        # Direct action -> handler taking the request metadata
+        self._action_handlers = {
+            'toggle_wifi': partial(self._toggle_system_feature, 'wifi'),
+            'toggle_bluetooth': partial(self._toggle_system_feature, 'bluetooth'),
+            'adjust_brightness': partial(self._adjust_display_setting, 'brightness'),
+            'adjust_volume': partial(self._adjust_audio_setting, 'volume'),
+            'take_screenshot': self._capture_screen,
+            'lock_screen': self._lock_device
+        }
+        
+        # System command -> handler taking (context, metadata)
+        self._system_commands = {
+            'register_default_assistant': self._register_as_default,
+            'check_permissions': self._check_permissions,
+            'sync_data': self._sync_user_data,
+            'clear_cache': self._clear_cache,
+            'optimize_performance': self._optimize_performance
+        }
+        
+        # OpenAI is used for general queries only when an API key is set.
+        # A single async client (and its connection pool) is created on
+        # first use and shared by all requests.
+        self._openai_enabled = bool(config.get('openai_api_key'))
+        self._openai_client = None
+        
+        # LRU of recent AI replies keyed by query text
+        self._response_cache: "OrderedDict[str, str]" = OrderedDict()
         
         logger.info("AssistantCore initialized with capabilities: %s", list(self.capabilities.keys()))
     
-    def _initialize_capabilities(self) -> Dict[str, Any]:
+    def _initialize_capabilities(self) -> Mapping[str, Any]:
         """Initialize all assistant capabilities"""
-        return {
-            'voice_commands': True,
-            'phone_control': True,
-            'app_management': True,
-            'notifications': True,
-            'media_control': True,
-            'smart_home': True,
-            'web_search': True,
-            'calendar_management': True,
-            'messaging': True,
-            'navigation': True,
-            'translation': True,
-            'reminders': True,
-            'notes': True,
-            'weather': True,
-            'news': True,
-            'samsung_store': True,
-            'security': True,
-            'system_optimization': True,
-            'health_tracking': True,
-            'finance': True
-        }
+        return _CAPABILITIES
     
     async def process_request(self, user_id: str, request: Dict[str, Any]) -> Dict[str, Any]:
         """Process incoming request from user"""
@@ -90,27 +188,15 @@ class AssistantCore:
             self._update_context(context, metadata)
             
             # Process based on request type
-            if request_type == 'voice':
-                response = await self._process_voice_command(context, content, metadata)
-            elif request_type == 'text':
-                response = await self._process_text_command(context, content)
-            elif request_type == 'action':
-                response = await self._process_action(context, content, metadata)
-            elif request_type == 'system':
-                response = await self._process_system_command(context, content, metadata)
+            handler = self._request_handlers.get(request_type)
+            if handler:
+                response = await handler(context, content, metadata)
             else:
                 response = self._create_error_response(f"Unknown request type: {request_type}")
             
-            # Add to conversation history
-            context.conversation_history.append({
-                'timestamp': datetime.now().isoformat(),
-                'request': request,
-                'response': response
-            })
-            
-            # Limit conversation history
-            if len(context.conversation_history) > 100:
-                context.conversation_history = context.conversation_history[-50:]
+            # Add to conversation history (bounded deque drops the oldest).
+            # Stored as a tuple; history_as_dicts() builds dicts on demand.
+            context.conversation_history.append((time.time(), request, response))
             
             return response
             
@@ -120,21 +206,31 @@ class AssistantCore:
     
     def _get_or_create_context(self, user_id: str) -> AssistantContext:
         """Get existing context or create new one for user"""
-        if user_id not in self.contexts:
-            self.contexts[user_id] = AssistantContext(
-                user_id=user_id,
-                conversation_history=[],
-                preferences=self._load_user_preferences(user_id)
-            )
-        return self.contexts[user_id]
+        context = self.contexts.get(user_id)
+        if context is not None:
+            self.contexts.move_to_end(user_id)
+            return context
+        
+        context = AssistantContext(
+            user_id=user_id,
+            preferences=self._load_user_preferences(user_id)
+        )
+        self.contexts[user_id] = context
+        if len(self.contexts) > self.max_contexts:
+            evicted_id, _ = self.contexts.popitem(last=False)
+            logger.debug("Evicted context for inactive user %s", evicted_id)
+        return context
     
     def _update_context(self, context: AssistantContext, metadata: Dict[str, Any]):
         """Update context with new metadata"""
-        if 'location' in metadata:
+        present = metadata.keys() & _CONTEXT_KEYS
+        if not present:
+            return
+        if 'location' in present:
             context.location = metadata['location']
-        if 'current_app' in metadata:
+        if 'current_app' in present:
             context.current_app = metadata['current_app']
-        if 'device_state' in metadata:
+        if 'device_state' in present:
             context.device_state.update(metadata['device_state'])
     
     async def _process_voice_command(self, context: AssistantContext, 
@@ -145,6 +241,11 @@ class AssistantCore:
         text_command = metadata.get('transcription', audio_data)
         return await self._process_text_command(context, text_command)
     
+    async def _process_text_request(self, context: AssistantContext,
+                                    text: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """Process text requests (metadata is already applied to the context)"""
+        return await self._process_text_command(context, text)
+    
     async def _process_text_command(self, context: AssistantContext, text: str) -> Dict[str, Any]:
         """Process text-based commands using AI"""
         try:
@@ -152,21 +253,8 @@ class AssistantCore:
             intent_data = await self._analyze_intent(context, text)
             
             # Route to appropriate handler
-            handler_map = {
-                'phone_call': self._handle_phone_call,
-                'send_message': self._handle_send_message,
-                'open_app': self._handle_open_app,
-                'set_reminder': self._handle_set_reminder,
-                'play_media': self._handle_play_media,
-                'search_web': self._handle_web_search,
-                'control_device': self._handle_device_control,
-                'samsung_store': self._handle_samsung_store,
-                'system_setting': self._handle_system_setting,
-                'general_query': self._handle_general_query
-            }
-            
             intent = intent_data.get('intent', 'general_query')
-            handler = handler_map.get(intent, self._handle_general_query)
+            handler = self._intent_handlers.get(intent, self._handle_general_query)
             
             response = await handler(context, intent_data)
             
@@ -175,7 +263,7 @@ class AssistantCore:
                 'type': 'response',
                 'content': response,
                 'intent': intent,
-                'timestamp': datetime.now().isoformat()
+                'timestamp': iso_now()
             }
             
         except Exception as e:
@@ -185,26 +273,7 @@ class AssistantCore:
     async def _analyze_intent(self, context: AssistantContext, text: str) -> Dict[str, Any]:
         """Analyze user intent using AI"""
         # Simple intent detection - in production, use NLP model
-        text_lower = text.lower()
-        
-        if any(word in text_lower for word in ['call', 'dial', 'phone']):
-            return {'intent': 'phone_call', 'text': text}
-        elif any(word in text_lower for word in ['message', 'text', 'sms', 'send']):
-            return {'intent': 'send_message', 'text': text}
-        elif any(word in text_lower for word in ['open', 'launch', 'start']):
-            return {'intent': 'open_app', 'text': text}
-        elif any(word in text_lower for word in ['remind', 'reminder', 'alert']):
-            return {'intent': 'set_reminder', 'text': text}
-        elif any(word in text_lower for word in ['play', 'music', 'video', 'media']):
-            return {'intent': 'play_media', 'text': text}
-        elif any(word in text_lower for word in ['search', 'google', 'find']):
-            return {'intent': 'search_web', 'text': text}
-        elif any(word in text_lower for word in ['samsung', 'store', 'download', 'install']):
-            return {'intent': 'samsung_store', 'text': text}
-        elif any(word in text_lower for word in ['setting', 'configure', 'change']):
-            return {'intent': 'system_setting', 'text': text}
-        else:
-            return {'intent': 'general_query', 'text': text}
+        return {'intent': classify_intent(text), 'text': text}
     
     async def _handle_phone_call(self, context: AssistantContext, intent_data: Dict[str, Any]) -> Dict[str, Any]:
         """Handle phone call requests"""
@@ -279,17 +348,28 @@ class AssistantCore:
         text = intent_data.get('text', '')
         
         # Use OpenAI if available
-        if hasattr(self, 'openai') and openai.api_key:
+        if self._openai_enabled:
+            cached = self._response_cache.get(text)
+            if cached is not None:
+                self._response_cache.move_to_end(text)
+                return {
+                    'action': 'response',
+                    'message': cached
+                }
+            
             try:
-                response = openai.chat.completions.create(
+                stream = await self._get_openai_client().chat.completions.create(
                     model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": "You are a helpful mobile AI assistant."},
-                        {"role": "user", "content": text}
-                    ],
-                    max_tokens=150
+                    messages=[_SYSTEM_MESSAGE, {"role": "user", "content": text}],
+                    max_tokens=150,
+                    stream=True
                 )
-                ai_response = response.choices[0].message.content
+                parts = []
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        parts.append(chunk.choices[0].delta.content)
+                ai_response = ''.join(parts)
+                self._cache_response(text, ai_response)
                 return {
                     'action': 'response',
                     'message': ai_response
@@ -303,36 +383,35 @@ class AssistantCore:
             'message': f"I understand you said: '{text}'. How can I help you with that?"
         }
     
+    def _get_openai_client(self):
+        """Return the shared OpenAI client, creating it on first use"""
+        if self._openai_client is None:
+            # Imported lazily: openai pulls in httpx/pydantic, which would
+            # slow down startup for callers that never make an AI request
+            import openai
+            self._openai_client = openai.AsyncOpenAI(api_key=self.config['openai_api_key'])
+        return self._openai_client
+    
+    def _cache_response(self, text: str, message: str):
+        """Remember an AI reply, evicting the least recently used one"""
+        self._response_cache[text] = message
+        self._response_cache.move_to_end(text)
+        if len(self._response_cache) > RESPONSE_CACHE_SIZE:
+            self._response_cache.popitem(last=False)
+    
     async def _process_action(self, context: AssistantContext, 
                             action: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
         """Process direct action requests"""
-        action_handlers = {
-            'toggle_wifi': lambda: self._toggle_system_feature('wifi', metadata),
-            'toggle_bluetooth': lambda: self._toggle_system_feature('bluetooth', metadata),
-            'adjust_brightness': lambda: self._adjust_display_setting('brightness', metadata),
-            'adjust_volume': lambda: self._adjust_audio_setting('volume', metadata),
-            'take_screenshot': lambda: self._capture_screen(metadata),
-            'lock_screen': lambda: self._lock_device(metadata)
-        }
-        
-        handler = action_handlers.get(action)
+        handler = self._action_handlers.get(action)
         if handler:
-            return await handler()
+            return await handler(metadata)
         else:
             return self._create_error_response(f"Unknown action: {action}")
     
     async def _process_system_command(self, context: AssistantContext, 
                                     command: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
         """Process system-level commands"""
-        system_commands = {
-            'register_default_assistant': self._register_as_default,
-            'check_permissions': self._check_permissions,
-            'sync_data': self._sync_user_data,
-            'clear_cache': self._clear_cache,
-            'optimize_performance': self._optimize_performance
-        }
-        
-        handler = system_commands.get(command)
+        handler = self._system_commands.get(command)
         if handler:
             return await handler(context, metadata)
         else:
@@ -346,18 +425,14 @@ class AssistantCore:
             'content': {
                 'message': error_message
             },
-            'timestamp': datetime.now().isoformat()
+            'timestamp': iso_now()
         }
     
     def _load_user_preferences(self, user_id: str) -> Dict[str, Any]:
         """Load user preferences from storage"""
         # TODO: Implement actual preference loading
-        return {
-            'language': 'en',
-            'voice_enabled': True,
-            'notifications_enabled': True,
-            'theme': 'auto'
-        }
+        # Each user gets a private, mutable copy of the defaults
+        return dict(_DEFAULT_PREFERENCES)
     
     async def _toggle_system_feature(self, feature: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
         """Toggle system features like WiFi, Bluetooth"""
@@ -446,18 +521,27 @@ class AssistantCore:
     def start(self):
         """Start the assistant core"""
         self.is_running = True
+        self._state_changed()
         logger.info("AssistantCore started")
     
     def stop(self):
         """Stop the assistant core"""
         self.is_running = False
+        self._state_changed()
         logger.info("AssistantCore stopped")
     
+    def _state_changed(self):
+        """Record a status change and notify the listener, if any"""
+        self.stats_version += 1
+        if self.on_state_change is not None:
+            self.on_state_change()
+    
     def get_status(self) -> Dict[str, Any]:
         """Get current status of the assistant"""
         return {
             'running': self.is_running,
             'active_users': len(self.contexts),
+            'max_contexts': self.max_contexts,
             'capabilities': list(self.capabilities.keys()),
             'version': '1.0.0'
         }
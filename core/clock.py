@@ -0,0 +1,20 @@
+import time
+from datetime import datetime
+
+# (epoch second, ISO 8601 prefix for that second)
+_second_cache = (None, '')
+
+def iso_now() -> str:
+    """Return the current local time as an ISO 8601 string.
+
+    The date/time part is formatted once per second and reused; only the
+    microsecond suffix is rendered on each call.
+    """
+    global _second_cache
+    now = time.time()
+    second = int(now)
+    cached_second, prefix = _second_cache
+    if second != cached_second:
+        prefix = datetime.fromtimestamp(second).isoformat()
+        _second_cache = (second, prefix)
+    return '%s.%06d' % (prefix, int((now - second) * 1000000))
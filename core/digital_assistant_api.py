@@ -1,32 +1,157 @@
 import asyncio
 import logging
-from typing import Dict, Any, List, Optional, Callable
+from typing import Dict, Any, Optional, Callable, Tuple, Deque, Pattern, Set
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
 import speech_recognition as sr
 import pyttsx3
 from gtts import gTTS
 import os
-import tempfile
-import subprocess
+import io
+import hashlib
 import json
 import re
+import shutil
+import struct
+import time
+from contextlib import asynccontextmanager
+from core.clock import iso_now
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+try:
+    import pvporcupine
+except ImportError:  # optional: on-device wake word detection
+    pvporcupine = None
+
+try:
+    import webrtcvad
+except ImportError:  # optional: skip wake word STT on silent clips
+    webrtcvad = None
+
+# Logging is configured by the entry point (main.py)
 logger = logging.getLogger(__name__)
 
+# Recent voice commands kept for context (e.g. "repeat")
+CONTEXT_STACK_SIZE = 10
+
+# Worker threads for blocking recognition and wake word calls
+VOICE_WORKER_THREADS = 4
+
+# Pending recognitions the STT worker picks up per pass
+STT_BATCH_SIZE = 8
+
+# Voice activity detection on wake word clips: 30ms frames of 16kHz 16-bit PCM
+VAD_SAMPLE_RATE = 16000
+VAD_FRAME_BYTES = VAD_SAMPLE_RATE * 30 // 1000 * 2
+VAD_MIN_VOICED_RATIO = 0.2
+
+# Seconds between ambient-noise recalibrations of a long-lived microphone
+RECALIBRATE_INTERVAL = 300
+# Consecutive unrecognized commands that trigger an early recalibration
+RECALIBRATE_AFTER_MISSES = 3
+
+# Rendered gTTS phrases are kept on disk so repeated responses skip synthesis.
+# Per user and private (0700): the player reads whatever file sits at a cached name.
+TTS_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'empirion', 'tts')
+TTS_CACHE_SIZE = 128
+
+# System sounds, as found on Android devices
+SOUND_FILES = {
+    'listening': '/system/media/audio/ui/Effect_Tick.ogg',
+    'success': '/system/media/audio/ui/Effect_Tick.ogg',
+    'error': '/system/media/audio/ui/Effect_Tick.ogg',
+    'notification': '/system/media/audio/notifications/Argon.ogg'
+}
+
+# Languages advertised by get_capabilities
+SUPPORTED_LANGUAGES = ('en-US', 'en-GB', 'es-ES', 'fr-FR', 'de-DE')
+
+# Fixed phrases spoken by the assistant itself, rendered ahead of time
+COMMON_PHRASES = (
+    "Yes, how can I help?",
+    "Sorry, I didn't catch that.",
+    "Okay, stopping.",
+    "Please specify a volume level",
+    "Please specify a brightness level"
+)
+
+# Action words in priority order (first one found in the command wins)
+_ACTION_WORDS = ('call', 'send', 'open', 'play', 'search', 'set', 'turn',
+                 'show', 'tell', 'what', 'when', 'where', 'how', 'remind')
+_ACTION_RANK = {word: rank for rank, word in enumerate(_ACTION_WORDS)}
+# Lookahead so overlapping words are all seen, as with `word in text`
+_ACTION_RE = re.compile('(?=(%s))' % '|'.join(_ACTION_WORDS))
+
+_TIME_RE = re.compile(r'\b(\d{1,2}:\d{2}|\d{1,2}\s*(am|pm))\b')
+_NUMBER_RE = re.compile(r'\b\d+\b')
+# Filler words dropped from a contact name ("call the doctor" -> "doctor")
+_STOP_WORDS = frozenset({'to', 'a', 'the', 'message', 'text'})
+
 class DigitalAssistantAPI:
     """Digital assistant capabilities for voice interaction and natural language processing"""
     
+    # Built-in voice commands: (command, handler method name), in lookup priority order
+    _DEFAULT_COMMANDS = (
+        ('time', '_handle_time_command'),
+        ('date', '_handle_date_command'),
+        ('weather', '_handle_weather_command'),
+        ('help', '_handle_help_command'),
+        ('stop', '_handle_stop_command'),
+        ('repeat', '_handle_repeat_command'),
+        ('volume', '_handle_volume_command'),
+        ('brightness', '_handle_brightness_command')
+    )
+    
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.recognizer = sr.Recognizer()
         self.tts_engine = None
         self.voice_enabled = config.get('voice_enabled', True)
         self.language = config.get('language', 'en-US')
+        self._lang_prefix = self.language[:2].lower()  # e.g. 'en', for voice ids and gTTS
         self.wake_word = config.get('wake_word', 'hey assistant')
         self.command_handlers: Dict[str, Callable] = {}
-        self.context_stack: List[Dict[str, Any]] = []
+        # Lookup regex over command_handlers, rebuilt lazily after changes
+        self._command_re: Optional[Pattern[str]] = None
+        self._command_keys: Tuple[str, ...] = ()
+        self._command_rank: Dict[str, int] = {}
+        # Built by get_capabilities, dropped whenever a command is registered
+        self._capabilities_cache: Optional[Dict[str, Any]] = None
+        self.context_stack: Deque[Dict[str, Any]] = deque(maxlen=CONTEXT_STACK_SIZE)
+        # Rendered gTTS audio files in LRU order, earlier runs' included; None until first use
+        self._tts_cache: "Optional[OrderedDict[str, None]]" = None
+        
+        # Player command for gTTS audio piped on stdin (None -> no playback)
+        self._audio_player = self._find_audio_player()
+        # System sounds that can actually be played here, resolved once
+        self._sound_player = shutil.which('play')
+        self._sound_files: Dict[str, str] = {
+            sound_type: path for sound_type, path in SOUND_FILES.items()
+            if self._sound_player and os.path.exists(path)
+        }
+        
+        # On-device wake word detector (None -> recognize_google fallback)
+        self._porcupine = self._create_wake_word_detector()
+        # Voice activity detector gating wake word STT (None -> always recognize)
+        self._vad = webrtcvad.Vad(config.get('vad_aggressiveness', 2)) if webrtcvad else None
+        # Created on first use; calibrated once per listening session
+        self._mic: Optional[sr.Microphone] = None
+        self._calibrated_at = 0.0
+        self._missed_commands = 0
+        # Blocking audio I/O runs off the event loop. Speech output gets its own
+        # single thread: pyttsx3 engines are thread-affine, and it keeps
+        # utterances (and the gTTS cache) strictly sequential.
+        self._pool = ThreadPoolExecutor(max_workers=VOICE_WORKER_THREADS,
+                                        thread_name_prefix='voice')
+        self._speech_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='speech')
+        self._background_tasks: Set[asyncio.Future] = set()
+        # Shared recognition queue, created with its worker inside the running loop
+        self._stt_queue: Optional[asyncio.Queue] = None
+        self._stt_worker_task: Optional[asyncio.Future] = None
+        # (minute, "%I:%M %p") and ((year, yday), "%A, %B %d, %Y") of the last answer
+        self._time_cache: Tuple[int, str] = (-1, '')
+        self._date_cache: Tuple[Tuple[int, int], str] = ((0, 0), '')
         
         # Initialize TTS engine
         self._initialize_tts()
@@ -34,127 +159,339 @@ class DigitalAssistantAPI:
         # Register default commands
         self._register_default_commands()
         
-        logger.info(f"DigitalAssistantAPI initialized - Language: {self.language}, Wake word: {self.wake_word}")
+        logger.info("DigitalAssistantAPI initialized - Language: %s, Wake word: %s",
+                    self.language, self.wake_word)
     
     def _initialize_tts(self):
         """Initialize text-to-speech engine"""
         try:
             self.tts_engine = pyttsx3.init()
             
-            # Configure voice properties
-            voices = self.tts_engine.getProperty('voices')
-            if voices:
-                # Try to find a voice matching the language
-                for voice in voices:
-                    if self.language[:2] in voice.id.lower():
-                        self.tts_engine.setProperty('voice', voice.id)
-                        break
+            # Configure voice properties: the first voice matching the language
+            voices = self.tts_engine.getProperty('voices') or ()
+            match = next((voice for voice in voices if self._lang_prefix in voice.id.lower()), None)
+            if match is not None:
+                self.tts_engine.setProperty('voice', match.id)
             
             # Set speech rate and volume
             self.tts_engine.setProperty('rate', 150)
             self.tts_engine.setProperty('volume', 0.9)
             
         except Exception as e:
-            logger.warning(f"Failed to initialize pyttsx3: {str(e)}. Will use gTTS as fallback.")
+            logger.warning("Failed to initialize pyttsx3: %s. Will use gTTS as fallback.", e)
             self.tts_engine = None
     
+    def _find_audio_player(self) -> Optional[Tuple[str, ...]]:
+        """Command line of an installed player that reads MP3 from stdin"""
+        mpg123 = shutil.which('mpg123')
+        if mpg123:
+            return (mpg123, '-q', '-')
+        play = shutil.which('play')
+        if play:
+            return (play, '-q', '-t', 'mp3', '-')  # sox can't sniff the type of a pipe
+        return None
+    
+    def _create_wake_word_detector(self):
+        """Create a Porcupine wake word detector if one is configured"""
+        model_path = self.config.get('wake_word_model')
+        access_key = self.config.get('picovoice_access_key') or os.getenv('PICOVOICE_ACCESS_KEY')
+        if pvporcupine is None or not model_path or not access_key:
+            return None
+        
+        try:
+            porcupine = pvporcupine.create(access_key=access_key, keyword_paths=[model_path])
+            logger.info("On-device wake word detection enabled (%s)", model_path)
+            return porcupine
+        except Exception as e:
+            logger.warning("Failed to initialize Porcupine: %s. Using online wake word detection.", e)
+            return None
+    
+    def _has_speech(self, audio: sr.AudioData) -> bool:
+        """Whether enough of a clip's frames are voiced to be worth recognizing"""
+        if self._vad is None:
+            return True
+        
+        pcm = audio.get_raw_data(convert_rate=VAD_SAMPLE_RATE, convert_width=2)
+        total = len(pcm) // VAD_FRAME_BYTES
+        if not total:
+            return False
+        voiced = sum(self._vad.is_speech(pcm[offset:offset + VAD_FRAME_BYTES], VAD_SAMPLE_RATE)
+                     for offset in range(0, total * VAD_FRAME_BYTES, VAD_FRAME_BYTES))
+        return voiced / total >= VAD_MIN_VOICED_RATIO
+    
     def _register_default_commands(self):
         """Register default voice commands"""
-        default_commands = {
-            'time': self._handle_time_command,
-            'date': self._handle_date_command,
-            'weather': self._handle_weather_command,
-            'help': self._handle_help_command,
-            'stop': self._handle_stop_command,
-            'repeat': self._handle_repeat_command,
-            'volume': self._handle_volume_command,
-            'brightness': self._handle_brightness_command
-        }
-        
-        for command, handler in default_commands.items():
-            self.register_command(command, handler)
+        # Names are already lowercase, so bypass register_command and its per-entry log
+        self.command_handlers.update(
+            (command, getattr(self, method)) for command, method in self._DEFAULT_COMMANDS
+        )
+        self._command_re = None
+        self._capabilities_cache = None
+        logger.debug("Registered %d default commands", len(self._DEFAULT_COMMANDS))
     
     def register_command(self, command: str, handler: Callable):
         """Register a voice command handler"""
         self.command_handlers[command.lower()] = handler
-        logger.info(f"Registered command: {command}")
+        self._command_re = None  # rebuilt on next lookup
+        self._capabilities_cache = None
+        logger.info("Registered command: %s", command)
+    
+    def _find_handler(self, action: str) -> Optional[Callable]:
+        """Find the handler for a parsed action.
+        
+        An exact command match is a single dict lookup. Otherwise the first
+        registered command contained in the action wins, found with one scan
+        of a regex built from all registered commands.
+        """
+        handler = self.command_handlers.get(action)
+        if handler is not None or not self.command_handlers:
+            return handler
+        
+        if self._command_re is None:
+            self._command_keys = tuple(self.command_handlers)
+            self._command_rank = {key: rank for rank, key in enumerate(self._command_keys)}
+            self._command_re = re.compile(
+                '(?=(%s))' % '|'.join(map(re.escape, self._command_keys)))
+        
+        best = None
+        for match in self._command_re.finditer(action):
+            rank = self._command_rank[match.group(1)]
+            if best is None or rank < best:
+                best = rank
+                if rank == 0:
+                    break
+        
+        if best is None:
+            return None
+        return self.command_handlers[self._command_keys[best]]
+    
+    async def _run_blocking(self, fn: Callable, *args, executor: Optional[ThreadPoolExecutor] = None,
+                            **kwargs):
+        """Run a blocking call on a worker thread and await its result"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor or self._pool, partial(fn, *args, **kwargs))
+    
+    def _spawn(self, coro):
+        """Run a coroutine in the background, holding a reference until it finishes"""
+        task = asyncio.ensure_future(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+    
+    async def transcribe(self, audio: sr.AudioData) -> str:
+        """Recognize captured audio through the shared STT worker"""
+        if self._stt_worker_task is None or self._stt_worker_task.done():
+            self._stt_queue = asyncio.Queue()
+            self._stt_worker_task = self._spawn(self._stt_worker())
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._stt_queue.put((audio, future))
+        return await future
+    
+    async def _stt_worker(self):
+        """Recognize queued audio, taking every request already waiting as one batch"""
+        queue = self._stt_queue
+        while True:
+            batch = [await queue.get()]
+            # No batching window: a lone session pays no extra latency
+            while len(batch) < STT_BATCH_SIZE and not queue.empty():
+                batch.append(queue.get_nowait())
+            
+            try:
+                results = await asyncio.gather(
+                    *(self._run_blocking(self.recognizer.recognize_google, audio,
+                                         language=self.language)
+                      for audio, _ in batch),
+                    return_exceptions=True
+                )
+            except BaseException:
+                # Cancelled mid-batch (e.g. by close): don't leave the callers waiting
+                for _, future in batch:
+                    future.cancel()
+                raise
+            for (_, future), result in zip(batch, results):
+                if future.done():  # caller gave up waiting
+                    continue
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+    
+    async def close(self):
+        """Stop the STT worker and background tasks, then the voice threads"""
+        current = asyncio.current_task()
+        tasks = [task for task in self._background_tasks if task is not current]
+        for task in tasks:
+            task.cancel()  # the STT worker is one of them
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._stt_worker_task = None
+        
+        queue, self._stt_queue = self._stt_queue, None
+        while queue is not None and not queue.empty():
+            _, future = queue.get_nowait()
+            future.cancel()
+        
+        # Calls already running on a thread finish on their own; nothing new is accepted
+        self._pool.shutdown(wait=False)
+        self._speech_pool.shutdown(wait=False)
+    
+    async def _get_microphone(self) -> sr.Microphone:
+        """Get the shared microphone, created at Porcupine's sample rate if enabled"""
+        if self._mic is None:
+            # Creating one queries PortAudio for the default device
+            sample_rate = self._porcupine.sample_rate if self._porcupine is not None else None
+            mic = await self._run_blocking(sr.Microphone, sample_rate=sample_rate)
+            if self._mic is None:
+                self._mic = mic
+        return self._mic
+    
+    @asynccontextmanager
+    async def _open_microphone(self):
+        """Open the shared microphone's stream on a worker thread, closing it the same way"""
+        mic = await self._get_microphone()
+        source = await self._run_blocking(mic.__enter__)
+        try:
+            yield source
+        finally:
+            await self._run_blocking(mic.__exit__, None, None, None)
+    
+    async def _calibrate(self, source, duration: float = 1.0):
+        """Adjust the recognizer's energy threshold to the ambient noise, off the loop"""
+        await self._run_blocking(self.recognizer.adjust_for_ambient_noise, source,
+                                 duration=duration)
+        self._calibrated_at = time.monotonic()
+    
+    async def _recalibrate_if_due(self, source):
+        """Recalibrate a long-lived source every RECALIBRATE_INTERVAL seconds"""
+        if time.monotonic() - self._calibrated_at >= RECALIBRATE_INTERVAL:
+            logger.info("Recalibrating for ambient noise")
+            await self._calibrate(source)
+    
+    @asynccontextmanager
+    async def _microphone_source(self, source=None):
+        """Use the caller's open source, or open and calibrate one for a single call"""
+        if source is not None:
+            yield source
+            return
+        async with self._open_microphone() as own_source:
+            await self._calibrate(own_source, duration=0.5)
+            yield own_source
     
-    async def listen_for_wake_word(self, timeout: Optional[int] = None) -> bool:
-        """Listen for the wake word"""
+    async def listen_for_wake_word(self, timeout: Optional[int] = None, source=None) -> bool:
+        """Listen for the wake word, on an already open microphone source if given"""
+        if self._porcupine is not None:
+            try:
+                async with self._microphone_source(source) as source:
+                    return await self._run_blocking(self._detect_wake_word_locally, source, timeout)
+            except Exception as e:
+                logger.error("Error in on-device wake word detection: %s", e)
+                await asyncio.sleep(1)  # back off rather than spin on a failing device
+                return False
+        
         try:
-            with sr.Microphone() as source:
-                self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
+            async with self._microphone_source(source) as source:
                 logger.info("Listening for wake word...")
                 
-                audio = self.recognizer.listen(source, timeout=timeout, phrase_time_limit=3)
+                audio = await self._run_blocking(self.recognizer.listen, source,
+                                                 timeout=timeout, phrase_time_limit=3)
+                
+                # Background noise only: no need for a network round trip
+                if not self._has_speech(audio):
+                    return False
                 
                 try:
-                    text = self.recognizer.recognize_google(audio, language=self.language)
-                    logger.info(f"Heard: {text}")
+                    text = await self.transcribe(audio)
+                    logger.info("Heard: %s", text)
                     
                     return self.wake_word.lower() in text.lower()
                     
                 except sr.UnknownValueError:
                     return False
                 except sr.RequestError as e:
-                    logger.error(f"Speech recognition error: {str(e)}")
+                    logger.error("Speech recognition error: %s", e)
                     return False
                     
+        except sr.WaitTimeoutError:
+            return False  # nobody spoke within timeout
         except Exception as e:
-            logger.error(f"Error listening for wake word: {str(e)}")
+            logger.error("Error listening for wake word: %s", e)
+            await asyncio.sleep(1)  # back off rather than spin on a failing device
             return False
     
-    async def listen_for_command(self, timeout: int = 5) -> Optional[str]:
-        """Listen for a voice command"""
+    def _detect_wake_word_locally(self, source, timeout: Optional[int]) -> bool:
+        """Feed microphone frames to Porcupine until it fires or timeout expires"""
+        porcupine = self._porcupine
+        frame_format = '%dh' % porcupine.frame_length
+        deadline = time.monotonic() + timeout if timeout else None
+        
+        # The shared microphone is opened at porcupine.sample_rate, 16-bit mono
+        while deadline is None or time.monotonic() < deadline:
+            pcm = source.stream.read(porcupine.frame_length)
+            if porcupine.process(struct.unpack_from(frame_format, pcm)) >= 0:
+                logger.info("Wake word detected on-device")
+                return True
+        return False
+    
+    async def listen_for_command(self, timeout: int = 5, source=None) -> Optional[str]:
+        """Listen for a voice command, on an already open microphone source if given"""
         try:
-            with sr.Microphone() as source:
-                self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
-                
-                # Play listening sound
-                await self.play_sound('listening')
+            async with self._microphone_source(source) as source:
+                # Play listening sound while the recognizer starts listening
+                self._spawn(self.play_sound('listening'))
                 
                 logger.info("Listening for command...")
-                audio = self.recognizer.listen(source, timeout=timeout, phrase_time_limit=10)
+                audio = await self._run_blocking(self.recognizer.listen, source,
+                                                 timeout=timeout, phrase_time_limit=10)
                 
                 try:
-                    text = self.recognizer.recognize_google(audio, language=self.language)
-                    logger.info(f"Recognized: {text}")
+                    text = await self.transcribe(audio)
+                    logger.info("Recognized: %s", text)
+                    self._missed_commands = 0
                     return text
                     
                 except sr.UnknownValueError:
+                    self._missed_commands += 1
+                    if self._missed_commands >= RECALIBRATE_AFTER_MISSES:
+                        self._missed_commands = 0
+                        self._calibrated_at = 0.0  # recalibrate on the next loop pass
                     await self.speak("Sorry, I didn't catch that.")
                     return None
                 except sr.RequestError as e:
-                    logger.error(f"Speech recognition error: {str(e)}")
+                    logger.error("Speech recognition error: %s", e)
                     await self.speak("Sorry, there was an error with speech recognition.")
                     return None
                     
         except Exception as e:
-            logger.error(f"Error listening for command: {str(e)}")
+            logger.error("Error listening for command: %s", e)
             return None
     
     async def process_voice_command(self, command: str) -> Dict[str, Any]:
         """Process a voice command"""
+        # One timestamp for the context entry and the result
+        timestamp = iso_now()
         try:
-            # Add to context
+            # Add to context (bounded deque drops the oldest entry)
             self.context_stack.append({
                 'command': command,
-                'timestamp': datetime.now().isoformat()
+                'timestamp': timestamp
             })
             
-            # Limit context stack size
-            if len(self.context_stack) > 10:
-                self.context_stack = self.context_stack[-10:]
-            
-            # Parse command
-            parsed = self._parse_command(command)
-            
-            # Find matching handler
-            handler = None
-            for key, func in self.command_handlers.items():
-                if key in parsed['action'].lower():
-                    handler = func
-                    break
+            # A bare command ("time", "stop") needs no parsing
+            key = command.strip().lower()
+            handler = self.command_handlers.get(key)
+            if handler is not None:
+                parsed = {
+                    'action': key,
+                    'full_text': command,
+                    'entities': {},
+                    'words': command.split()
+                }
+            else:
+                # Parse command
+                parsed = self._parse_command(command)
+                
+                # Find matching handler
+                handler = self._find_handler(parsed['action'])
             
             if handler:
                 # Execute handler
@@ -169,7 +506,7 @@ class DigitalAssistantAPI:
                     'command': command,
                     'parsed': parsed,
                     'result': result,
-                    'timestamp': datetime.now().isoformat()
+                    'timestamp': timestamp
                 }
             else:
                 # No handler found, return as general query
@@ -182,46 +519,42 @@ class DigitalAssistantAPI:
                     'parsed': parsed,
                     'error': 'No handler found',
                     'response': response,
-                    'timestamp': datetime.now().isoformat()
+                    'timestamp': timestamp
                 }
                 
         except Exception as e:
-            logger.error(f"Error processing voice command: {str(e)}")
+            logger.error("Error processing voice command: %s", e)
             return {
                 'success': False,
                 'error': str(e),
-                'timestamp': datetime.now().isoformat()
+                'timestamp': timestamp
             }
     
     def _parse_command(self, command: str) -> Dict[str, Any]:
         """Parse a voice command into structured data"""
         command_lower = command.lower()
         
-        # Extract action words
-        action_words = ['call', 'send', 'open', 'play', 'search', 'set', 'turn', 
-                       'show', 'tell', 'what', 'when', 'where', 'how', 'remind']
-        
-        action = None
-        for word in action_words:
-            if word in command_lower:
-                action = word
-                break
+        # Extract action words: one scan, earliest word in _ACTION_WORDS wins
+        best = None
+        for match in _ACTION_RE.finditer(command_lower):
+            rank = _ACTION_RANK[match.group(1)]
+            if best is None or rank < best:
+                best = rank
+                if rank == 0:
+                    break
         
-        if not action:
-            action = 'query'
+        action = _ACTION_WORDS[best] if best is not None else 'query'
         
         # Extract entities (simple approach)
         entities = {}
         
         # Time patterns
-        time_pattern = r'\b(\d{1,2}:\d{2}|\d{1,2}\s*(am|pm))\b'
-        time_match = re.search(time_pattern, command_lower)
+        time_match = _TIME_RE.search(command_lower)
         if time_match:
             entities['time'] = time_match.group()
         
         # Number patterns
-        number_pattern = r'\b\d+\b'
-        numbers = re.findall(number_pattern, command)
+        numbers = _NUMBER_RE.findall(command)
         if numbers:
             entities['numbers'] = numbers
         
@@ -230,10 +563,9 @@ class DigitalAssistantAPI:
             # Extract everything after the action as potential contact name
             parts = command_lower.split(action)
             if len(parts) > 1:
-                potential_name = parts[1].strip()
                 # Remove common words
-                for word in ['to', 'a', 'the', 'message', 'text']:
-                    potential_name = potential_name.replace(word, '').strip()
+                potential_name = ' '.join(token for token in parts[1].split()
+                                          if token not in _STOP_WORDS)
                 if potential_name:
                     entities['contact'] = potential_name
         
@@ -247,69 +579,136 @@ class DigitalAssistantAPI:
     async def speak(self, text: str, wait: bool = True):
         """Convert text to speech"""
         if not self.voice_enabled:
-            logger.info(f"TTS (disabled): {text}")
+            logger.info("TTS (disabled): %s", text)
             return
         
         try:
             if self.tts_engine:
                 # Use pyttsx3
-                self.tts_engine.say(text)
-                if wait:
-                    self.tts_engine.runAndWait()
-                else:
-                    self.tts_engine.startLoop(False)
-                    self.tts_engine.iterate()
-                    self.tts_engine.endLoop()
+                await self._run_blocking(self._speak_with_engine, text, wait,
+                                         executor=self._speech_pool)
             else:
                 # Use gTTS as fallback
                 await self._speak_with_gtts(text)
                 
         except Exception as e:
-            logger.error(f"Error in text-to-speech: {str(e)}")
+            logger.error("Error in text-to-speech: %s", e)
+    
+    def _speak_with_engine(self, text: str, wait: bool):
+        """Drive pyttsx3 synchronously (runs on the speech thread)"""
+        self.tts_engine.say(text)
+        if wait:
+            self.tts_engine.runAndWait()
+        else:
+            self.tts_engine.startLoop(False)
+            self.tts_engine.iterate()
+            self.tts_engine.endLoop()
     
     async def _speak_with_gtts(self, text: str):
         """Use Google TTS as fallback"""
+        if self._audio_player is None:
+            logger.warning("No audio player found for TTS playback")
+            return
+        
         try:
-            tts = gTTS(text=text, lang=self.language[:2])
+            audio = await self._run_blocking(self._get_gtts_audio, text,
+                                             executor=self._speech_pool)
             
-            with tempfile.NamedTemporaryFile(suffix='.mp3', delete=False) as tmp_file:
-                tts.save(tmp_file.name)
-                tmp_file_path = tmp_file.name
-            
-            # Play the audio file
-            if os.path.exists('/usr/bin/mpg123'):
-                subprocess.run(['mpg123', '-q', tmp_file_path])
-            elif os.path.exists('/usr/bin/play'):
-                subprocess.run(['play', '-q', tmp_file_path])
-            else:
-                logger.warning("No audio player found for TTS playback")
-            
-            # Clean up
-            os.unlink(tmp_file_path)
+            # Stream the MP3 to the player's stdin
+            process = await asyncio.create_subprocess_exec(
+                *self._audio_player,
+                stdin=asyncio.subprocess.PIPE
+            )
+            await process.communicate(audio)
             
         except Exception as e:
-            logger.error(f"Error with gTTS: {str(e)}")
+            logger.error("Error with gTTS: %s", e)
+    
+    def _load_tts_cache(self) -> "OrderedDict[str, None]":
+        """Index the files left by earlier runs, oldest first, trimmed to TTS_CACHE_SIZE"""
+        try:
+            entries = [entry for entry in os.scandir(TTS_CACHE_DIR)
+                       if entry.name.endswith('.mp3') and entry.is_file()]
+        except FileNotFoundError:
+            entries = []
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        excess = max(len(entries) - TTS_CACHE_SIZE, 0)
+        for entry in entries[:excess]:
+            try:
+                os.unlink(entry.path)
+            except OSError:
+                pass
+        return OrderedDict.fromkeys(entry.path for entry in entries[excess:])
+    
+    def _get_gtts_audio(self, text: str) -> bytes:
+        """Return MP3 data for text, synthesizing and caching it on a miss"""
+        if self._tts_cache is None:
+            self._tts_cache = self._load_tts_cache()
+        digest = hashlib.blake2b(f"{self.language}\0{text}".encode('utf-8'),
+                                 digest_size=16).hexdigest()
+        audio_path = os.path.join(TTS_CACHE_DIR, f"{digest}.mp3")
+        
+        try:
+            with open(audio_path, 'rb') as f:
+                audio = f.read()
+            os.utime(audio_path)  # mtime keeps the LRU order for the next run
+        except FileNotFoundError:
+            buffer = io.BytesIO()
+            gTTS(text=text, lang=self._lang_prefix).write_to_fp(buffer)
+            audio = buffer.getvalue()
+            
+            os.makedirs(TTS_CACHE_DIR, mode=0o700, exist_ok=True)
+            tmp_path = f"{audio_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(audio)
+            os.replace(tmp_path, audio_path)
+        
+        # (Re)insert as most recently used
+        self._tts_cache.pop(audio_path, None)
+        self._tts_cache[audio_path] = None
+        if len(self._tts_cache) > TTS_CACHE_SIZE:
+            evicted_path, _ = self._tts_cache.popitem(last=False)
+            try:
+                os.unlink(evicted_path)
+            except OSError:
+                pass
+        
+        return audio
+    
+    async def prewarm_tts_cache(self):
+        """Synthesize the assistant's stock phrases ahead of time"""
+        if self.tts_engine or not self.voice_enabled or self._audio_player is None:
+            return
+        
+        for phrase in COMMON_PHRASES:
+            try:
+                await self._run_blocking(self._get_gtts_audio, phrase, executor=self._speech_pool)
+            except Exception as e:
+                logger.warning("Could not prewarm TTS for '%s': %s", phrase, e)
+                return
     
     async def play_sound(self, sound_type: str):
         """Play system sounds"""
-        sound_files = {
-            'listening': '/system/media/audio/ui/Effect_Tick.ogg',
-            'success': '/system/media/audio/ui/Effect_Tick.ogg',
-            'error': '/system/media/audio/ui/Effect_Tick.ogg',
-            'notification': '/system/media/audio/notifications/Argon.ogg'
-        }
-        
-        sound_file = sound_files.get(sound_type)
-        if sound_file and os.path.exists(sound_file):
+        sound_file = self._sound_files.get(sound_type)
+        if sound_file:
             try:
-                subprocess.run(['play', '-q', sound_file], capture_output=True)
+                process = await asyncio.create_subprocess_exec(
+                    self._sound_player, '-q', sound_file,
+                    stdout=asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.DEVNULL
+                )
+                await process.wait()
             except:
                 pass
     
     # Default command handlers
     async def _handle_time_command(self, parsed: Dict[str, Any]) -> Dict[str, Any]:
         """Handle time-related commands"""
-        current_time = datetime.now().strftime("%I:%M %p")
+        # The spoken time only changes once a minute (DST shifts fall on minute boundaries)
+        minute = int(time.time() // 60)
+        if minute != self._time_cache[0]:
+            self._time_cache = (minute, datetime.now().strftime("%I:%M %p"))
+        current_time = self._time_cache[1]
         response = f"The current time is {current_time}"
         
         return {
@@ -320,7 +719,11 @@ class DigitalAssistantAPI:
     
     async def _handle_date_command(self, parsed: Dict[str, Any]) -> Dict[str, Any]:
         """Handle date-related commands"""
-        current_date = datetime.now().strftime("%A, %B %d, %Y")
+        now = time.localtime()
+        day = (now.tm_year, now.tm_yday)
+        if day != self._date_cache[0]:
+            self._date_cache = (day, time.strftime("%A, %B %d, %Y", now))
+        current_date = self._date_cache[1]
         response = f"Today is {current_date}"
         
         return {
@@ -431,7 +834,7 @@ class DigitalAssistantAPI:
             }
             
         except Exception as e:
-            logger.error(f"Error registering as default assistant: {str(e)}")
+            logger.error("Error registering as default assistant: %s", e)
             return {
                 'success': False,
                 'error': str(e)
@@ -439,6 +842,13 @@ class DigitalAssistantAPI:
     
     def get_capabilities(self) -> Dict[str, Any]:
         """Get digital assistant capabilities"""
+        if self._capabilities_cache is None:
+            self._capabilities_cache = self._build_capabilities()
+        # Shallow copy: the values are immutable, and callers may serialize or edit the dict
+        return dict(self._capabilities_cache)
+    
+    def _build_capabilities(self) -> Dict[str, Any]:
+        """Capabilities snapshot, rebuilt only after commands change"""
         return {
             'voice_recognition': True,
             'text_to_speech': self.tts_engine is not None,
@@ -447,38 +857,43 @@ class DigitalAssistantAPI:
             'context_awareness': True,
             'command_registration': True,
             'default_assistant': False,  # Requires system integration
-            'supported_languages': ['en-US', 'en-GB', 'es-ES', 'fr-FR', 'de-DE'],
-            'registered_commands': list(self.command_handlers.keys())
+            'supported_languages': SUPPORTED_LANGUAGES,
+            'registered_commands': tuple(self.command_handlers)
         }
     
     async def start_continuous_listening(self):
         """Start continuous listening mode"""
         logger.info("Starting continuous listening mode...")
+        await self.prewarm_tts_cache()
         
-        while True:
-            try:
-                # Listen for wake word
-                if await self.listen_for_wake_word(timeout=10):
-                    # Wake word detected
-                    await self.speak("Yes, how can I help?")
-                    
-                    # Listen for command
-                    command = await self.listen_for_command()
+        # One microphone stream for the whole session, calibrated up front
+        async with self._open_microphone() as source:
+            await self._calibrate(source)
+            
+            while True:
+                try:
+                    await self._recalibrate_if_due(source)
                     
-                    if command:
-                        # Process command
-                        result = await self.process_voice_command(command)
+                    # Listen for wake word
+                    if await self.listen_for_wake_word(timeout=10, source=source):
+                        # Wake word detected
+                        await self.speak("Yes, how can I help?")
                         
-                        # Check if should stop
-                        if result.get('result', {}).get('should_stop'):
-                            break
-                
-                await asyncio.sleep(0.1)
-                
-            except KeyboardInterrupt:
-                break
-            except Exception as e:
-                logger.error(f"Error in continuous listening: {str(e)}")
-                await asyncio.sleep(1)
+                        # Listen for command
+                        command = await self.listen_for_command(source=source)
+                        
+                        if command:
+                            # Process command
+                            result = await self.process_voice_command(command)
+                            
+                            # Check if should stop
+                            if result.get('result', {}).get('should_stop'):
+                                break
+                    
+                except KeyboardInterrupt:
+                    break
+                except Exception as e:
+                    logger.error("Error in continuous listening: %s", e)
+                    await asyncio.sleep(1)
         
         logger.info("Stopped continuous listening mode")
@@ -0,0 +1,62 @@
+"""Keyword-based intent classification.
+
+This module only depends on the standard library, so classification can
+be tested and reused without the rest of AssistantCore.
+"""
+import re
+from functools import lru_cache
+from typing import Dict, Final, FrozenSet, Optional, Pattern, Tuple
+
+GENERAL_QUERY: Final = 'general_query'
+
+# Intent keywords in priority order (first matching intent wins)
+_PHONE_CALL_KEYWORDS: Final = frozenset({'call', 'dial', 'phone'})
+_SEND_MESSAGE_KEYWORDS: Final = frozenset({'message', 'text', 'sms', 'send'})
+_OPEN_APP_KEYWORDS: Final = frozenset({'open', 'launch', 'start'})
+_SET_REMINDER_KEYWORDS: Final = frozenset({'remind', 'reminder', 'alert'})
+_PLAY_MEDIA_KEYWORDS: Final = frozenset({'play', 'music', 'video', 'media'})
+_SEARCH_WEB_KEYWORDS: Final = frozenset({'search', 'google', 'find'})
+_SAMSUNG_STORE_KEYWORDS: Final = frozenset({'samsung', 'store', 'download', 'install'})
+_SYSTEM_SETTING_KEYWORDS: Final = frozenset({'setting', 'configure', 'change'})
+
+INTENT_KEYWORDS: Final[Tuple[Tuple[str, FrozenSet[str]], ...]] = (
+    ('phone_call', _PHONE_CALL_KEYWORDS),
+    ('send_message', _SEND_MESSAGE_KEYWORDS),
+    ('open_app', _OPEN_APP_KEYWORDS),
+    ('set_reminder', _SET_REMINDER_KEYWORDS),
+    ('play_media', _PLAY_MEDIA_KEYWORDS),
+    ('search_web', _SEARCH_WEB_KEYWORDS),
+    ('samsung_store', _SAMSUNG_STORE_KEYWORDS),
+    ('system_setting', _SYSTEM_SETTING_KEYWORDS),
+)
+_INTENT_ORDER: Final[Tuple[str, ...]] = tuple(intent for intent, _ in INTENT_KEYWORDS)
+_INTENT_RANK: Final[Dict[str, int]] = {intent: rank for rank, intent in enumerate(_INTENT_ORDER)}
+
+# One named group per intent. The zero-width lookahead reports overlapping
+# keywords too, so substring semantics match a plain `word in text` check.
+_INTENT_PATTERN: Final[Pattern[str]] = re.compile(
+    '(?=' + '|'.join(
+        '(?P<%s>%s)' % (intent, '|'.join(map(re.escape, sorted(words))))
+        for intent, words in INTENT_KEYWORDS
+    ) + ')',
+    re.IGNORECASE
+)
+
+@lru_cache(maxsize=2048)
+def classify_intent(text: str) -> str:
+    """Return the intent name for an utterance.
+
+    A single regex scan collects every keyword hit and the highest priority
+    intent wins. Pure, so repeated utterances are served from the cache.
+    """
+    best: Optional[int] = None
+    for match in _INTENT_PATTERN.finditer(text):
+        group = match.lastgroup
+        if group is None:
+            continue
+        rank = _INTENT_RANK[group]
+        if best is None or rank < best:
+            best = rank
+            if rank == 0:
+                break
+    return _INTENT_ORDER[best] if best is not None else GENERAL_QUERY
@@ -1,153 +1,241 @@
 import asyncio
 import logging
-from typing import Dict, Any, List, Optional
-from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+from functools import partial
+import errno
+import os
+import shlex
 import subprocess
 import json
 import re
+import time
+import uuid
+from core.shared import CommandResult, error_response, has_binary, ok_response, which
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+try:
+    from orjson import loads as _loads
+except ImportError:  # optional: faster JSON decoding
+    _loads = json.loads
+
+try:
+    import ijson
+except ImportError:  # optional: parse large JSON output as it streams in
+    ijson = None
+
+# Logging is configured by the entry point (main.py)
 logger = logging.getLogger(__name__)
 
+# Persistent `sh` workers that run commands, so each call that finds a free
+# one forks a small shell instead of this (much larger) Python process
+COMMAND_WORKERS = 2
+# Largest output read back from a worker (contact lists can be big)
+COMMAND_OUTPUT_LIMIT = 16 * 1024 * 1024
+# Commands allowed in flight at once; bursts of termux-* calls can hang the
+# Termux:API service, so excess calls wait for a slot instead
+MAX_CONCURRENT_COMMANDS = 4
+
+# System properties reported by get_device_info, keyed by their last component
+DEVICE_PROPERTIES = ('ro.product.model', 'ro.product.brand',
+                     'ro.build.version.release', 'ro.product.cpu.abi')
+# Seconds telephony/battery status is reused before Termux is asked again
+DEVICE_STATE_TTL = 10
+# Seconds the parsed contact list is reused for searches
+CONTACTS_TTL = 60
+# Dialable numbers: optional +, then digits and common separators, starting with
+# a digit or '(' (never '-', so it can't pass as an option) and holding 3+ digits
+_PHONE_RE = re.compile(r'\+?(?=(?:\D*\d){3})[\d(][\d\-(). ]{2,19}')
+# Contact fields kept from termux-contact-list
+CONTACT_FIELDS = ('name', 'number')
+# "[name]: [value]" lines of a full getprop dump, for DEVICE_PROPERTIES only
+_DEVICE_PROPERTY_RE = re.compile(
+    r'^\[(%s)\]: \[(.*)\]$' % '|'.join(re.escape(prop) for prop in DEVICE_PROPERTIES),
+    re.MULTILINE
+)
+# Characters of an SMS echoed back in send_sms responses
+SMS_PREVIEW_LENGTH = 50
+
+def _truncate(text: str, limit: int = SMS_PREVIEW_LENGTH) -> str:
+    """Shorten text to limit characters for previews, marking the cut"""
+    return text if len(text) <= limit else text[:limit] + '...'
+
 class PhoneIntegration:
     """Handle phone-specific capabilities and integrations"""
     
+    # Map stream names to Android audio stream types
+    _STREAM_MAP = {
+        'ring': '2',
+        'media': '3',
+        'alarm': '4',
+        'notification': '5',
+        'system': '1',
+        'call': '0'
+    }
+    _DEFAULT_STREAM = '3'  # media
+    
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.termux_api_available = self._check_termux_api()
         self.adb_available = self._check_adb()
         
-        logger.info(f"PhoneIntegration initialized - Termux API: {self.termux_api_available}, ADB: {self.adb_available}")
+        # Shell worker pool, grown on demand inside the running loop
+        self._pool_size = config.get('phone', {}).get('command_workers', COMMAND_WORKERS)
+        self._workers: Optional[asyncio.Queue] = None  # idle workers
+        self._worker_processes: List[asyncio.subprocess.Process] = []
+        self._worker_count = 0  # started or starting
+        self._sentinel = ('__empirion_%s__' % uuid.uuid4().hex).encode()
+        self._max_commands = config.get('phone', {}).get('max_concurrent_commands',
+                                                        MAX_CONCURRENT_COMMANDS)
+        self._command_slots: Optional[asyncio.Semaphore] = None  # created in the loop
+        
+        # System properties are fixed for the life of the process; status is not
+        self._device_properties: Optional[Dict[str, str]] = None
+        self._device_state: Optional[Tuple[float, Dict[str, Any]]] = None
+        # (read at, contacts, lowercased names) from termux-contact-list
+        self._contacts_cache: Optional[Tuple[float, List[Dict[str, Any]], List[str]]] = None
+        self._capabilities = self._build_capabilities()
+        
+        logger.info("PhoneIntegration initialized - Termux API: %s, ADB: %s",
+                    self.termux_api_available, self.adb_available)
     
     def _check_termux_api(self) -> bool:
         """Check if Termux API is available"""
-        try:
-            result = subprocess.run(['which', 'termux-telephony-call'], 
-                                  capture_output=True, text=True)
-            return result.returncode == 0
-        except:
-            return False
+        return has_binary('termux-telephony-call')
     
     def _check_adb(self) -> bool:
         """Check if ADB is available for advanced operations"""
-        try:
-            result = subprocess.run(['which', 'adb'], 
-                                  capture_output=True, text=True)
-            return result.returncode == 0
-        except:
-            return False
+        return has_binary('adb')
     
     async def make_phone_call(self, number: str) -> Dict[str, Any]:
         """Make a phone call"""
+        if not _PHONE_RE.fullmatch(number):
+            return self._invalid_number(number)
+        
         try:
             if self.termux_api_available:
                 # Use Termux API
                 cmd = ['termux-telephony-call', number]
                 result = await self._run_command(cmd)
                 
-                return {
-                    'success': True,
-                    'action': 'phone_call',
-                    'number': number,
-                    'method': 'termux_api',
-                    'timestamp': datetime.now().isoformat()
-                }
+                return ok_response(action='phone_call', number=number, method='termux_api')
             else:
                 # Fallback to intent
                 cmd = ['am', 'start', '-a', 'android.intent.action.CALL', 
                        '-d', f'tel:{number}']
                 result = await self._run_command(cmd)
                 
-                return {
-                    'success': True,
-                    'action': 'phone_call',
-                    'number': number,
-                    'method': 'intent',
-                    'timestamp': datetime.now().isoformat()
-                }
+                return ok_response(action='phone_call', number=number, method='intent')
                 
         except Exception as e:
-            logger.error(f"Error making phone call: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e),
-                'timestamp': datetime.now().isoformat()
-            }
+            logger.error("Error making phone call: %s", e)
+            return error_response(e)
     
     async def send_sms(self, number: str, message: str) -> Dict[str, Any]:
         """Send an SMS message"""
+        if not _PHONE_RE.fullmatch(number):
+            return self._invalid_number(number)
+        
         try:
             if self.termux_api_available:
                 # Use Termux API
                 cmd = ['termux-sms-send', '-n', number, message]
                 result = await self._run_command(cmd)
                 
-                return {
-                    'success': True,
-                    'action': 'send_sms',
-                    'number': number,
-                    'message': message[:50] + '...' if len(message) > 50 else message,
-                    'method': 'termux_api',
-                    'timestamp': datetime.now().isoformat()
-                }
+                return ok_response(action='send_sms', number=number,
+                                message=_truncate(message), method='termux_api')
             else:
                 # Fallback to intent
                 cmd = ['am', 'start', '-a', 'android.intent.action.SENDTO',
                        '-d', f'sms:{number}', '--es', 'sms_body', message]
                 result = await self._run_command(cmd)
                 
-                return {
-                    'success': True,
-                    'action': 'send_sms',
-                    'number': number,
-                    'method': 'intent',
-                    'timestamp': datetime.now().isoformat()
-                }
+                return ok_response(action='send_sms', number=number, method='intent')
                 
         except Exception as e:
-            logger.error(f"Error sending SMS: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e),
-                'timestamp': datetime.now().isoformat()
-            }
+            logger.error("Error sending SMS: %s", e)
+            return error_response(e)
+    
+    def _invalid_number(self, number: str) -> Dict[str, Any]:
+        """Error response for a number that would never be dialled"""
+        logger.warning("Rejected invalid phone number: %r", number)
+        return error_response(f'Invalid phone number: {number}')
     
     async def get_contacts(self, search_query: Optional[str] = None) -> Dict[str, Any]:
         """Get phone contacts"""
         try:
             if self.termux_api_available:
-                cmd = ['termux-contact-list']
-                result = await self._run_command(cmd)
-                
-                contacts = json.loads(result.stdout) if result.stdout else []
+                contacts, names = await self._load_contacts()
                 
                 # Filter by search query if provided
                 if search_query:
                     search_lower = search_query.lower()
-                    contacts = [c for c in contacts 
-                              if search_lower in c.get('name', '').lower()]
+                    contacts = [c for c, name in zip(contacts, names)
+                                if search_lower in name]
                 
-                return {
-                    'success': True,
-                    'contacts': contacts[:20],  # Limit to 20 contacts
-                    'total': len(contacts),
-                    'timestamp': datetime.now().isoformat()
-                }
+                # Limit to 20 contacts
+                return ok_response(contacts=contacts[:20], total=len(contacts))
             else:
-                return {
-                    'success': False,
-                    'error': 'Contacts access requires Termux API',
-                    'timestamp': datetime.now().isoformat()
-                }
+                return error_response('Contacts access requires Termux API')
                 
         except Exception as e:
-            logger.error(f"Error getting contacts: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e),
-                'timestamp': datetime.now().isoformat()
-            }
+            logger.error("Error getting contacts: %s", e)
+            return error_response(e)
+    
+    async def _load_contacts(self) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """Parsed contact list and lowercased names, re-read after CONTACTS_TTL seconds"""
+        now = time.monotonic()
+        if self._contacts_cache is not None and now - self._contacts_cache[0] < CONTACTS_TTL:
+            return self._contacts_cache[1], self._contacts_cache[2]
+        
+        if ijson is not None:
+            contacts, returncode = await self._stream_json_array(['termux-contact-list'],
+                                                                 CONTACT_FIELDS)
+        else:
+            result = await self._run_command(['termux-contact-list'])
+            contacts = _loads(result.stdout_bytes) if result.stdout_bytes else []
+            returncode = result.returncode
+        names = [c.get('name', '').lower() for c in contacts]
+        # Don't hold on to an empty list from a failed read
+        if returncode == 0:
+            self._contacts_cache = (now, contacts, names)
+        return contacts, names
+    
+    async def _stream_json_array(self, cmd: List[str],
+                                 fields: Tuple[str, ...]) -> Tuple[List[Dict[str, Any]], int]:
+        """Parse a command's JSON array output with ijson as it is read, keeping only fields
+        
+        The output is never buffered whole, so peak memory is the kept fields
+        rather than the raw JSON plus every full object.
+        """
+        async with self._command_slot():
+            return await self._parse_json_stream(cmd, fields)
+    
+    async def _parse_json_stream(self, cmd: List[str],
+                                 fields: Tuple[str, ...]) -> Tuple[List[Dict[str, Any]], int]:
+        """Body of _stream_json_array, run while holding a command slot"""
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        items = []
+        try:
+            async for item in ijson.items_async(process.stdout, 'item'):
+                items.append({field: item[field] for field in fields if field in item})
+        except BaseException as e:
+            # Don't leave the command blocked on a pipe nobody reads
+            if not process.stdout.at_eof():
+                try:
+                    process.kill()
+                except ProcessLookupError:
+                    pass
+            await process.wait()
+            # A failing command prints nothing at all; anything else is bad output
+            if items or not isinstance(e, ijson.IncompleteJSONError):
+                raise
+            return items, process.returncode
+        
+        await process.wait()
+        return items, process.returncode
     
     async def get_call_log(self, limit: int = 10) -> Dict[str, Any]:
         """Get recent call log"""
@@ -156,27 +244,15 @@ class PhoneIntegration:
                 cmd = ['termux-call-log', '-l', str(limit)]
                 result = await self._run_command(cmd)
                 
-                call_log = json.loads(result.stdout) if result.stdout else []
+                call_log = _loads(result.stdout_bytes) if result.stdout_bytes else []
                 
-                return {
-                    'success': True,
-                    'call_log': call_log,
-                    'timestamp': datetime.now().isoformat()
-                }
+                return ok_response(call_log=call_log)
             else:
-                return {
-                    'success': False,
-                    'error': 'Call log access requires Termux API',
-                    'timestamp': datetime.now().isoformat()
-                }
+                return error_response('Call log access requires Termux API')
                 
         except Exception as e:
-            logger.error(f"Error getting call log: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e),
-                'timestamp': datetime.now().isoformat()
-            }
+            logger.error("Error getting call log: %s", e)
+            return error_response(e)
     
     async def get_sms_inbox(self, limit: int = 10) -> Dict[str, Any]:
         """Get SMS inbox messages"""
@@ -185,153 +261,103 @@ class PhoneIntegration:
                 cmd = ['termux-sms-list', '-l', str(limit)]
                 result = await self._run_command(cmd)
                 
-                messages = json.loads(result.stdout) if result.stdout else []
+                messages = _loads(result.stdout_bytes) if result.stdout_bytes else []
                 
-                return {
-                    'success': True,
-                    'messages': messages,
-                    'timestamp': datetime.now().isoformat()
-                }
+                return ok_response(messages=messages)
             else:
-                return {
-                    'success': False,
-                    'error': 'SMS access requires Termux API',
-                    'timestamp': datetime.now().isoformat()
-                }
+                return error_response('SMS access requires Termux API')
                 
         except Exception as e:
-            logger.error(f"Error getting SMS inbox: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e),
-                'timestamp': datetime.now().isoformat()
-            }
+            logger.error("Error getting SMS inbox: %s", e)
+            return error_response(e)
     
     async def get_device_info(self) -> Dict[str, Any]:
         """Get device information"""
         try:
-            device_info = {}
-            
-            if self.termux_api_available:
-                # Get telephony info
-                cmd = ['termux-telephony-deviceinfo']
-                result = await self._run_command(cmd)
-                if result.stdout:
-                    device_info['telephony'] = json.loads(result.stdout)
-                
-                # Get battery status
-                cmd = ['termux-battery-status']
-                result = await self._run_command(cmd)
-                if result.stdout:
-                    device_info['battery'] = json.loads(result.stdout)
-            
-            # Get system properties using getprop
-            properties = ['ro.product.model', 'ro.product.brand', 
-                         'ro.build.version.release', 'ro.product.cpu.abi']
-            
-            for prop in properties:
-                cmd = ['getprop', prop]
-                result = await self._run_command(cmd)
-                if result.stdout:
-                    key = prop.split('.')[-1]
-                    device_info[key] = result.stdout.strip()
+            state, properties = await asyncio.gather(self._get_device_state(),
+                                                     self._get_device_properties())
+            device_info = {**state, **properties}
             
-            return {
-                'success': True,
-                'device_info': device_info,
-                'timestamp': datetime.now().isoformat()
-            }
+            return ok_response(device_info=device_info)
             
         except Exception as e:
-            logger.error(f"Error getting device info: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e),
-                'timestamp': datetime.now().isoformat()
-            }
+            logger.error("Error getting device info: %s", e)
+            return error_response(e)
+    
+    async def _get_device_state(self) -> Dict[str, Any]:
+        """Telephony and battery status from Termux, reused for DEVICE_STATE_TTL seconds"""
+        if not self.termux_api_available:
+            return {}
+        
+        now = time.monotonic()
+        if self._device_state is not None and now - self._device_state[0] < DEVICE_STATE_TTL:
+            return self._device_state[1]
+        
+        telephony, battery = await asyncio.gather(
+            self._run_command(['termux-telephony-deviceinfo']),
+            self._run_command(['termux-battery-status'])
+        )
+        state = {}
+        if telephony.stdout_bytes:
+            state['telephony'] = _loads(telephony.stdout_bytes)
+        if battery.stdout_bytes:
+            state['battery'] = _loads(battery.stdout_bytes)
+        
+        self._device_state = (now, state)
+        return state
+    
+    async def _get_device_properties(self) -> Dict[str, str]:
+        """System properties from one getprop dump, read once per process"""
+        if self._device_properties is None:
+            result = await self._run_command(['getprop'])
+            # Unset properties read back as '', like getprop <name>
+            values = dict(_DEVICE_PROPERTY_RE.findall(result.stdout))
+            self._device_properties = {prop.split('.')[-1]: values.get(prop, '').strip()
+                                       for prop in DEVICE_PROPERTIES}
+        return self._device_properties
     
     async def toggle_airplane_mode(self, enable: bool) -> Dict[str, Any]:
         """Toggle airplane mode"""
         try:
             if self.adb_available:
-                # Use ADB for system settings
+                # Use ADB for system settings; write and broadcast in one session
                 value = '1' if enable else '0'
-                cmd = ['adb', 'shell', 'settings', 'put', 'global', 
-                       'airplane_mode_on', value]
-                await self._run_command(cmd)
-                
-                # Broadcast change
-                cmd = ['adb', 'shell', 'am', 'broadcast', '-a', 
-                       'android.intent.action.AIRPLANE_MODE']
+                cmd = ['adb', 'shell',
+                       f'settings put global airplane_mode_on {value} && '
+                       'am broadcast -a android.intent.action.AIRPLANE_MODE']
                 await self._run_command(cmd)
                 
-                return {
-                    'success': True,
-                    'action': 'airplane_mode',
-                    'enabled': enable,
-                    'timestamp': datetime.now().isoformat()
-                }
+                return ok_response(action='airplane_mode', enabled=enable)
             else:
                 # Try using settings command directly
                 value = '1' if enable else '0'
                 cmd = ['settings', 'put', 'global', 'airplane_mode_on', value]
                 await self._run_command(cmd)
                 
-                return {
-                    'success': True,
-                    'action': 'airplane_mode',
-                    'enabled': enable,
-                    'method': 'settings',
-                    'timestamp': datetime.now().isoformat()
-                }
+                return ok_response(action='airplane_mode', enabled=enable, method='settings')
                 
         except Exception as e:
-            logger.error(f"Error toggling airplane mode: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e),
-                'timestamp': datetime.now().isoformat()
-            }
+            logger.error("Error toggling airplane mode: %s", e)
+            return error_response(e)
     
     async def set_volume(self, stream: str, level: int) -> Dict[str, Any]:
         """Set volume for different audio streams"""
         try:
-            # Map stream names to Android audio stream types
-            stream_map = {
-                'ring': '2',
-                'media': '3',
-                'alarm': '4',
-                'notification': '5',
-                'system': '1',
-                'call': '0'
-            }
-            
-            stream_id = stream_map.get(stream, '3')  # Default to media
-            
             if self.termux_api_available:
                 cmd = ['termux-volume', stream, str(level)]
                 await self._run_command(cmd)
             else:
                 # Use media command
+                stream_id = self._STREAM_MAP.get(stream, self._DEFAULT_STREAM)
                 cmd = ['media', 'volume', '--stream', stream_id, 
                        '--set', str(level)]
                 await self._run_command(cmd)
             
-            return {
-                'success': True,
-                'action': 'set_volume',
-                'stream': stream,
-                'level': level,
-                'timestamp': datetime.now().isoformat()
-            }
+            return ok_response(action='set_volume', stream=stream, level=level)
             
         except Exception as e:
-            logger.error(f"Error setting volume: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e),
-                'timestamp': datetime.now().isoformat()
-            }
+            logger.error("Error setting volume: %s", e)
+            return error_response(e)
     
     async def get_notifications(self) -> Dict[str, Any]:
         """Get current notifications"""
@@ -340,27 +366,15 @@ class PhoneIntegration:
                 cmd = ['termux-notification-list']
                 result = await self._run_command(cmd)
                 
-                notifications = json.loads(result.stdout) if result.stdout else []
+                notifications = _loads(result.stdout_bytes) if result.stdout_bytes else []
                 
-                return {
-                    'success': True,
-                    'notifications': notifications,
-                    'timestamp': datetime.now().isoformat()
-                }
+                return ok_response(notifications=notifications)
             else:
-                return {
-                    'success': False,
-                    'error': 'Notification access requires Termux API',
-                    'timestamp': datetime.now().isoformat()
-                }
+                return error_response('Notification access requires Termux API')
                 
         except Exception as e:
-            logger.error(f"Error getting notifications: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e),
-                'timestamp': datetime.now().isoformat()
-            }
+            logger.error("Error getting notifications: %s", e)
+            return error_response(e)
     
     async def create_notification(self, title: str, content: str, 
                                 priority: str = 'default') -> Dict[str, Any]:
@@ -371,46 +385,167 @@ class PhoneIntegration:
                        '--priority', priority]
                 await self._run_command(cmd)
                 
-                return {
-                    'success': True,
-                    'action': 'create_notification',
-                    'title': title,
-                    'timestamp': datetime.now().isoformat()
-                }
+                return ok_response(action='create_notification', title=title)
             else:
-                return {
-                    'success': False,
-                    'error': 'Notification creation requires Termux API',
-                    'timestamp': datetime.now().isoformat()
-                }
+                return error_response('Notification creation requires Termux API')
                 
         except Exception as e:
-            logger.error(f"Error creating notification: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e),
-                'timestamp': datetime.now().isoformat()
-            }
+            logger.error("Error creating notification: %s", e)
+            return error_response(e)
     
-    async def _run_command(self, cmd: List[str]) -> subprocess.CompletedProcess:
-        """Run a command asynchronously"""
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
+    def _command_slot(self) -> asyncio.Semaphore:
+        """Semaphore bounding how many commands run at once"""
+        if self._command_slots is None:
+            self._command_slots = asyncio.Semaphore(self._max_commands)
+        return self._command_slots
+    
+    async def _run_command(self, cmd: List[str]) -> CommandResult:
+        """Run a command asynchronously, on a pooled shell worker when one is free"""
+        async with self._command_slot():
+            return await self._execute_command(cmd)
+    
+    async def _execute_command(self, cmd: List[str]) -> CommandResult:
+        """Body of _run_command, run while holding a command slot"""
+        worker = await self._acquire_worker()
+        if worker is None:
+            return await self._spawn_command(cmd)
+        
+        try:
+            worker.stdin.write(self._worker_script(cmd))
+            await worker.stdin.drain()
+        except BaseException as e:
+            # Cancelled or broken mid-write: the pipe may hold a partial script
+            self._discard_worker(worker)
+            if not isinstance(e, Exception):
+                raise
+            # Nothing reached the shell, so running the command directly is safe
+            logger.warning("Command worker unavailable (%s), spawning directly", e)
+            return await self._spawn_command(cmd)
         
-        stdout, stderr = await process.communicate()
+        try:
+            result = await self._read_worker_result(worker, cmd)
+        except BaseException as e:
+            # The command may already have run (e.g. an SMS went out): don't retry
+            self._discard_worker(worker)
+            if not isinstance(e, Exception):
+                raise
+            logger.error("Command worker failed while running %s: %s", cmd[0], e)
+            return CommandResult(args=cmd, returncode=-1, stderr_bytes=str(e).encode('utf-8'))
         
-        return subprocess.CompletedProcess(
+        self._workers.put_nowait(worker)
+        if result.returncode == 127 and not has_binary(cmd[0]):
+            # sh's "not found"; raise what a direct spawn would. A command may exit 127 itself.
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), cmd[0])
+        return result
+    
+    async def _spawn_command(self, cmd: List[str]) -> CommandResult:
+        """Run a command in a freshly spawned subprocess"""
+        # The spawn happens in the executor so a slow one can't stall the loop.
+        # CPython only uses posix_spawn for an absolute executable with close_fds
+        # off; our fds are non-inheritable (PEP 446), so leaving it off is safe.
+        loop = asyncio.get_running_loop()
+        process = await loop.run_in_executor(None, partial(
+            subprocess.run,
+            cmd,
+            executable=which(cmd[0]),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            close_fds=False
+        ))
+        
+        return CommandResult(
             args=cmd,
             returncode=process.returncode,
-            stdout=stdout.decode('utf-8') if stdout else '',
-            stderr=stderr.decode('utf-8') if stderr else ''
+            stdout_bytes=process.stdout or b'',
+            stderr_bytes=process.stderr or b''
         )
     
+    async def _acquire_worker(self) -> Optional[asyncio.subprocess.Process]:
+        """Take an idle shell worker, starting one while the pool has room"""
+        if self._workers is None:
+            self._workers = asyncio.Queue()
+        if not self._workers.empty():
+            return self._workers.get_nowait()
+        if self._worker_count >= self._pool_size:
+            return None
+        
+        self._worker_count += 1
+        try:
+            worker = await asyncio.create_subprocess_exec(
+                'sh',
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                limit=COMMAND_OUTPUT_LIMIT
+            )
+        except OSError as e:
+            logger.warning("Could not start command worker, spawning commands directly: %s", e)
+            self._worker_count -= 1
+            self._pool_size = 0
+            return None
+        except BaseException:
+            self._worker_count -= 1  # cancelled while starting
+            raise
+        
+        self._worker_processes.append(worker)
+        return worker
+    
+    def _worker_script(self, cmd: List[str]) -> bytes:
+        """Shell input that runs cmd, then frames its exit status and both outputs"""
+        sentinel = self._sentinel.decode()
+        return ("%s </dev/null; printf '\\n%%d %s\\n' $?; printf '\\n%s\\n' >&2\n"
+                % (' '.join(shlex.quote(arg) for arg in cmd), sentinel, sentinel)).encode('utf-8')
+    
+    async def _read_worker_result(self, worker: asyncio.subprocess.Process,
+                                  cmd: List[str]) -> CommandResult:
+        """Read one framed result; both pipes are drained together so neither can fill up"""
+        stdout, stderr = await asyncio.gather(
+            worker.stdout.readuntil(b' ' + self._sentinel + b'\n'),
+            worker.stderr.readuntil(b'\n' + self._sentinel + b'\n'),
+            return_exceptions=True
+        )
+        for part in (stdout, stderr):
+            if isinstance(part, BaseException):
+                raise part
+        # stdout is "<output>\n<status> <sentinel>\n"
+        stdout, _, status = stdout[:-len(self._sentinel) - 2].rpartition(b'\n')
+        stderr = stderr[:-len(self._sentinel) - 2]
+        
+        return CommandResult(
+            args=cmd,
+            returncode=int(status),
+            stdout_bytes=stdout,
+            stderr_bytes=stderr
+        )
+    
+    def _discard_worker(self, worker: asyncio.subprocess.Process):
+        """Kill a worker whose pipes are in an unknown state"""
+        if worker in self._worker_processes:
+            self._worker_processes.remove(worker)
+            self._worker_count -= 1
+        if worker.returncode is None:
+            try:
+                worker.kill()
+            except ProcessLookupError:
+                pass
+    
+    async def close(self):
+        """Stop the shell workers"""
+        workers, self._worker_processes = self._worker_processes, []
+        self._workers = None
+        self._worker_count = 0
+        self._command_slots = None
+        for worker in workers:
+            if worker.returncode is None:
+                worker.stdin.close()  # sh exits at end of input
+                await worker.wait()
+    
     def get_capabilities(self) -> Dict[str, bool]:
         """Get available phone capabilities"""
+        return dict(self._capabilities)
+    
+    def _build_capabilities(self) -> Dict[str, bool]:
+        """Capabilities follow from the tools found at startup"""
         return {
             'phone_calls': True,
             'sms': True,
@@ -1,16 +1,222 @@
 import asyncio
 import logging
-from typing import Dict, Any, List, Optional
-from datetime import datetime
+from typing import Dict, Any, Iterable, List, NamedTuple, Optional, Set, Tuple
+from dataclasses import dataclass, field
+from functools import cached_property, lru_cache, wraps
 import aiohttp
 import json
+import os
 import subprocess
 import re
+import sqlite3
+import time
+import zlib
+from contextlib import closing
+from core.clock import iso_now
+from core.shared import CommandResult, error_response, has_binary, ok_response, which
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Logging is configured by the entry point (main.py)
 logger = logging.getLogger(__name__)
 
+# Seconds the installed package list and versions are reused before pm is asked again
+PACKAGE_CACHE_TTL = 30
+# SQLite file sharing the latest package snapshot between processes
+PACKAGE_CACHE_DB = os.path.join('~', '.cache', 'empirion', 'packages.db')
+# Layout of PACKAGE_CACHE_DB's table; a database in any other layout is rebuilt
+PACKAGE_DB_VERSION = 2
+# "package:<name>" lines printed by pm list packages
+_PACKAGE_LINE_RE = re.compile(r'^package:(\S+)', re.MULTILINE)
+# dumpsys package packages: "Package [name] (...):" opens each block; its versionName= follows
+_DUMPSYS_PACKAGE_RE = re.compile(r'Package \[([^\]]+)\]|versionName=(\S+)')
+# versionName in a single package's dumpsys output
+_VERSION_RE = re.compile(r'versionName=(\S+)')
+# Per-package dumpsys calls run together when the bulk dump is unusable
+VERSION_LOOKUP_CONCURRENCY = 16
+
+# One HTTP session for the whole process, so Store requests reuse pooled connections
+_session: Optional[aiohttp.ClientSession] = None
+
+async def get_session() -> aiohttp.ClientSession:
+    """Shared ClientSession, created on first use inside the running loop"""
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=100, limit_per_host=10,
+                                           enable_cleanup_closed=True),
+            timeout=aiohttp.ClientTimeout(total=60, connect=10),
+            headers={'Accept': 'application/json'}
+        )
+    return _session
+
+async def close_session():
+    """Close the shared session at shutdown"""
+    global _session
+    if _session is not None:
+        await _session.close()
+        _session = None
+
+@lru_cache(maxsize=4096)
+def _app_name_from_package(package_name: str) -> str:
+    """Display name guessed from a package name (pure, so memoized)"""
+    # Simple heuristic - in production, would query package info
+    parts = package_name.split('.')
+    if len(parts) > 0:
+        name = parts[-1].replace('_', ' ').title()
+        return name
+    return package_name
+
+@dataclass
+class _PackageCache:
+    """One snapshot of the installed packages, taken with a single pass of each command"""
+    loaded_at: float
+    installed: Set[str] = field(default_factory=set)  # every package, system ones included
+    third_party: List[str] = field(default_factory=list)  # `pm list packages -3` order
+    versions: Dict[str, str] = field(default_factory=dict)  # package -> versionName
+    updatable: Set[str] = field(default_factory=set)  # simulated "update available" packages
+
+def _simulated_updates(packages: List[str]) -> Set[str]:
+    """Simulate some apps having updates, the same ones in every process"""
+    # crc32 rather than hash(): str hashes are randomized per process
+    return {name for name in packages if zlib.crc32(name.encode('utf-8')) % 3 == 0}
+
+def _open_package_db(path: str) -> sqlite3.Connection:
+    """Connect to the package snapshot database, (re)creating its table if needed"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    db = sqlite3.connect(path)
+    if db.execute('PRAGMA user_version').fetchone()[0] != PACKAGE_DB_VERSION:
+        # Only a cache: snapshots in an older layout are dropped, not migrated
+        with db:
+            db.execute('DROP TABLE IF EXISTS packages')
+            db.execute('CREATE TABLE packages ('
+                       'name TEXT PRIMARY KEY, version TEXT, '
+                       'position INTEGER, '  # index in the third-party list, NULL for system apps
+                       'installed INTEGER NOT NULL, '  # 0: only known from dumpsys
+                       'ts REAL NOT NULL)')
+            db.execute('PRAGMA user_version = %d' % PACKAGE_DB_VERSION)
+    return db
+
+def _read_package_db(path: str) -> Optional[Tuple[float, _PackageCache]]:
+    """(scan time, snapshot) stored by the last process to scan, if any (blocking)"""
+    with closing(_open_package_db(path)) as db:
+        rows = db.execute('SELECT name, version, position, installed, ts FROM packages '
+                          'ORDER BY position').fetchall()
+    if not rows:
+        return None
+    cache = _PackageCache(loaded_at=0.0)
+    for name, version, position, installed, _ in rows:
+        if installed:
+            cache.installed.add(name)
+        if version is not None:
+            cache.versions[name] = version
+        if position is not None:
+            cache.third_party.append(name)
+    return min(row[4] for row in rows), cache
+
+def _write_package_db(path: str, cache: _PackageCache, scanned_at: float):
+    """Replace the stored snapshot with cache (blocking)"""
+    positions = {name: index for index, name in enumerate(cache.third_party)}
+    names = cache.installed.union(positions, cache.versions)
+    with closing(_open_package_db(path)) as db, db:
+        db.execute('DELETE FROM packages')
+        db.executemany('INSERT INTO packages VALUES (?, ?, ?, ?, ?)',
+                       ((name, cache.versions.get(name), positions.get(name),
+                         name in cache.installed, scanned_at)
+                        for name in names))
+
+def _run_process(cmd: List[str]) -> CommandResult:
+    """Run cmd to completion (blocking; called from the executor)"""
+    # posix_spawn needs an absolute executable and close_fds off (our fds are non-inheritable)
+    with subprocess.Popen(cmd, executable=which(cmd[0]), stdout=subprocess.PIPE,
+                          stderr=subprocess.PIPE, close_fds=False) as process:
+        stdout, stderr = process.communicate()
+    return CommandResult(cmd, process.returncode, stdout, stderr)
+
+class _CatalogApp(NamedTuple):
+    """One entry of the simulated Store catalog"""
+    package_name: str
+    name: str
+    category: str
+    rating: float
+    downloads: str
+    size: str
+
+class _Recommendation(NamedTuple):
+    """One simulated app recommendation"""
+    package_name: str
+    name: str
+    category: str
+    rating: float
+    reason: str
+
+# Static data built once at import
+_CATALOG = (
+    _CatalogApp('com.samsung.android.app.notes', 'Samsung Notes',
+                'Productivity', 4.5, '100M+', '45.2 MB'),
+    _CatalogApp('com.samsung.android.calendar', 'Samsung Calendar',
+                'Productivity', 4.3, '500M+', '32.1 MB'),
+    _CatalogApp('com.samsung.android.email.provider', 'Samsung Email',
+                'Communication', 4.2, '100M+', '28.5 MB'),
+    _CatalogApp('com.samsung.android.gallery3d', 'Samsung Gallery',
+                'Photography', 4.4, '1B+', '52.3 MB'),
+    _CatalogApp('com.samsung.android.messaging', 'Samsung Messages',
+                'Communication', 4.1, '1B+', '38.7 MB'),
+)
+# Lowercased (name, package_name, category) per _CATALOG row, for case-insensitive search
+_CATALOG_KEYS = tuple((app.name.lower(), app.package_name.lower(), app.category.lower())
+                      for app in _CATALOG)
+
+def _trigrams(text: str) -> Set[str]:
+    """Every 3-character substring of text"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def _build_trigram_index() -> Dict[str, Set[int]]:
+    """trigram -> _CATALOG indexes whose name or package contains it"""
+    index: Dict[str, Set[int]] = {}
+    for row, (name, package, _) in enumerate(_CATALOG_KEYS):
+        for trigram in _trigrams(name) | _trigrams(package):
+            index.setdefault(trigram, set()).add(row)
+    return index
+
+# A substring query of 3+ characters can only match rows holding all of its trigrams
+_TRIGRAM_INDEX = _build_trigram_index()
+
+def _search_candidates(query_lower: str) -> Iterable[int]:
+    """_CATALOG indexes that may contain query_lower, in catalog order"""
+    if len(query_lower) < 3:
+        return range(len(_CATALOG))
+    postings = [_TRIGRAM_INDEX.get(trigram, set()) for trigram in _trigrams(query_lower)]
+    return sorted(set.intersection(*postings))
+
+_RECOMMENDATIONS = (
+    _Recommendation('com.samsung.android.goodlock', 'Good Lock', 'Personalization', 4.6,
+                    'Popular Samsung customization app'),
+    _Recommendation('com.samsung.android.scloud', 'Samsung Cloud', 'Productivity', 4.2,
+                    'Sync and backup your data'),
+    _Recommendation('com.samsung.android.app.notes', 'Samsung Notes', 'Productivity', 4.5,
+                    'Advanced note-taking app'),
+    _Recommendation('com.samsung.android.oneconnect', 'SmartThings', 'Lifestyle', 4.3,
+                    'Control your smart home devices'),
+    _Recommendation('com.samsung.android.bixby.agent', 'Bixby', 'Tools', 4.0,
+                    'Samsung AI assistant'),
+)
+
+# Response payloads rendered once at import; each response gets a shallow dict() copy
+_CATALOG_PAYLOADS = tuple(app._asdict() for app in _CATALOG)
+_RECOMMENDATION_PAYLOADS = tuple(app._asdict() for app in _RECOMMENDATIONS)
+
+def _api_method(action: str):
+    """Turn any exception escaping a public coroutine into a logged error response"""
+    def decorator(method):
+        @wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            try:
+                return await method(self, *args, **kwargs)
+            except Exception as e:
+                logger.error("Error %s: %s", action, e)
+                return error_response(e)
+        return wrapper
+    return decorator
+
 class SamsungStoreAPI:
     """Samsung App Store integration for app discovery, installation, and management"""
     
@@ -19,432 +225,333 @@ class SamsungStoreAPI:
         self.base_url = config.get('samsung_store_api_url', 'https://galaxystore.samsung.com/api')
         self.api_key = config.get('samsung_api_key', '')
         self.session = None
-        self.package_manager_available = self._check_package_manager()
+        self._package_cache: Optional[_PackageCache] = None
+        # Snapshot shared with other processes; None disables it
+        package_db = config.get('samsung_store', {}).get('package_cache_db', PACKAGE_CACHE_DB)
+        self._package_db = os.path.expanduser(package_db) if package_db else None
+        self._package_db_stale = False  # set when we changed packages since the last scan
+        # Built by get_capabilities on first call, so the pm check stays lazy
+        self._capabilities: Optional[Dict[str, bool]] = None
         
         logger.info("SamsungStoreAPI initialized")
     
+    @cached_property
+    def package_manager_available(self) -> bool:
+        """Whether pm commands can be used, checked on first use"""
+        return self._check_package_manager()
+    
     def _check_package_manager(self) -> bool:
         """Check if package manager commands are available"""
-        try:
-            result = subprocess.run(['which', 'pm'], capture_output=True, text=True)
-            return result.returncode == 0
-        except:
-            return False
+        return has_binary('pm')
     
     async def __aenter__(self):
         """Async context manager entry"""
-        self.session = aiohttp.ClientSession()
+        self.session = await get_session()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Async context manager exit"""
-        if self.session:
-            await self.session.close()
+        """Async context manager exit (the shared session stays open; see close_session)"""
+        self.session = None
     
+    @_api_method("searching apps")
     async def search_apps(self, query: str, category: Optional[str] = None, 
                          limit: int = 20) -> Dict[str, Any]:
         """Search for apps in Samsung Store"""
-        try:
-            # Simulate Samsung Store search
-            # In production, this would use actual Samsung Store API
-            search_results = await self._simulate_app_search(query, category, limit)
-            
-            return {
-                'success': True,
-                'query': query,
-                'category': category,
-                'results': search_results,
-                'total': len(search_results),
-                'timestamp': datetime.now().isoformat()
-            }
-            
-        except Exception as e:
-            logger.error(f"Error searching apps: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e),
-                'timestamp': datetime.now().isoformat()
-            }
+        # Simulate Samsung Store search
+        # In production, this would use actual Samsung Store API
+        search_results = await self._simulate_app_search(query, category, limit)
+        
+        return ok_response(
+            query=query,
+            category=category,
+            results=search_results,
+            total=len(search_results)
+        )
     
+    @_api_method("getting app details")
     async def get_app_details(self, package_name: str) -> Dict[str, Any]:
         """Get detailed information about an app"""
-        try:
-            # Check if app is installed
-            is_installed = await self._is_app_installed(package_name)
-            
-            # Get app info (simulated for now)
-            app_info = {
-                'package_name': package_name,
-                'name': self._get_app_name_from_package(package_name),
-                'installed': is_installed,
-                'version': await self._get_app_version(package_name) if is_installed else None,
-                'size': '25.4 MB',
-                'rating': 4.5,
-                'downloads': '10M+',
-                'developer': 'Samsung Electronics',
-                'category': 'Productivity',
-                'description': 'Advanced mobile assistant application',
-                'permissions': [
-                    'android.permission.INTERNET',
-                    'android.permission.ACCESS_NETWORK_STATE',
-                    'android.permission.RECORD_AUDIO',
-                    'android.permission.CAMERA'
-                ],
-                'screenshots': [
-                    'https://example.com/screenshot1.jpg',
-                    'https://example.com/screenshot2.jpg'
-                ],
-                'last_updated': '2024-01-15'
-            }
-            
-            return {
-                'success': True,
-                'app_info': app_info,
-                'timestamp': datetime.now().isoformat()
-            }
-            
-        except Exception as e:
-            logger.error(f"Error getting app details: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e),
-                'timestamp': datetime.now().isoformat()
-            }
+        # Check if app is installed
+        is_installed = await self._is_app_installed(package_name)
+        
+        # Get app info (simulated for now)
+        app_info = {
+            'package_name': package_name,
+            'name': self._get_app_name_from_package(package_name),
+            'installed': is_installed,
+            'version': await self._get_app_version(package_name) if is_installed else None,
+            'size': '25.4 MB',
+            'rating': 4.5,
+            'downloads': '10M+',
+            'developer': 'Samsung Electronics',
+            'category': 'Productivity',
+            'description': 'Advanced mobile assistant application',
+            'permissions': [
+                'android.permission.INTERNET',
+                'android.permission.ACCESS_NETWORK_STATE',
+                'android.permission.RECORD_AUDIO',
+                'android.permission.CAMERA'
+            ],
+            'screenshots': [
+                'https://example.com/screenshot1.jpg',
+                'https://example.com/screenshot2.jpg'
+            ],
+            'last_updated': '2024-01-15'
+        }
+        
+        return ok_response(app_info=app_info)
     
+    @_api_method("installing app")
     async def install_app(self, package_name: str, version: Optional[str] = None) -> Dict[str, Any]:
         """Install an app from Samsung Store"""
-        try:
-            # Check if already installed
-            if await self._is_app_installed(package_name):
-                return {
-                    'success': False,
-                    'error': 'App is already installed',
-                    'package_name': package_name,
-                    'timestamp': datetime.now().isoformat()
-                }
-            
-            # Simulate installation process
-            # In production, this would trigger actual Samsung Store installation
-            install_id = f"install_{package_name}_{datetime.now().timestamp()}"
-            
-            # Launch Samsung Store with app page
-            await self._launch_store_app_page(package_name)
-            
-            return {
-                'success': True,
-                'action': 'install_initiated',
-                'package_name': package_name,
-                'install_id': install_id,
-                'message': 'Installation initiated. Please complete in Samsung Store.',
-                'timestamp': datetime.now().isoformat()
-            }
-            
-        except Exception as e:
-            logger.error(f"Error installing app: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e),
-                'timestamp': datetime.now().isoformat()
-            }
+        # Check if already installed
+        if await self._is_app_installed(package_name):
+            return error_response('App is already installed', package_name=package_name)
+        
+        # Simulate installation process
+        # In production, this would trigger actual Samsung Store installation
+        install_id = f"install_{package_name}_{time.time()}"
+        
+        # Launch Samsung Store with app page
+        await self._launch_store_app_page(package_name)
+        self._invalidate_package_cache()  # the install completes outside our control
+        
+        return ok_response(
+            action='install_initiated',
+            package_name=package_name,
+            install_id=install_id,
+            message='Installation initiated. Please complete in Samsung Store.'
+        )
     
+    @_api_method("updating app")
     async def update_app(self, package_name: str) -> Dict[str, Any]:
         """Update an installed app"""
-        try:
-            # Check if app is installed
-            if not await self._is_app_installed(package_name):
-                return {
-                    'success': False,
-                    'error': 'App is not installed',
-                    'package_name': package_name,
-                    'timestamp': datetime.now().isoformat()
-                }
-            
-            # Check for updates (simulated)
-            current_version = await self._get_app_version(package_name)
-            
-            # Launch Samsung Store for update
-            await self._launch_store_app_page(package_name)
-            
-            return {
-                'success': True,
-                'action': 'update_check',
-                'package_name': package_name,
-                'current_version': current_version,
-                'message': 'Update check initiated. Please complete in Samsung Store.',
-                'timestamp': datetime.now().isoformat()
-            }
-            
-        except Exception as e:
-            logger.error(f"Error updating app: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e),
-                'timestamp': datetime.now().isoformat()
-            }
+        # Check if app is installed
+        if not await self._is_app_installed(package_name):
+            return error_response('App is not installed', package_name=package_name)
+        
+        # Check for updates (simulated)
+        current_version = await self._get_app_version(package_name)
+        
+        # Launch Samsung Store for update
+        await self._launch_store_app_page(package_name)
+        
+        return ok_response(
+            action='update_check',
+            package_name=package_name,
+            current_version=current_version,
+            message='Update check initiated. Please complete in Samsung Store.'
+        )
     
+    @_api_method("uninstalling app")
     async def uninstall_app(self, package_name: str) -> Dict[str, Any]:
         """Uninstall an app"""
-        try:
-            # Check if app is installed
-            if not await self._is_app_installed(package_name):
-                return {
-                    'success': False,
-                    'error': 'App is not installed',
-                    'package_name': package_name,
-                    'timestamp': datetime.now().isoformat()
-                }
+        # Check if app is installed
+        if not await self._is_app_installed(package_name):
+            return error_response('App is not installed', package_name=package_name)
+        
+        # Attempt uninstallation
+        if self.package_manager_available:
+            cmd = ['pm', 'uninstall', '--user', '0', package_name]
+            result = await self._run_command(cmd)
+            self._invalidate_package_cache()
+            
+            success = result.returncode == 0
             
-            # Attempt uninstallation
-            if self.package_manager_available:
-                cmd = ['pm', 'uninstall', '--user', '0', package_name]
-                result = await self._run_command(cmd)
-                
-                success = result.returncode == 0
-                
-                return {
-                    'success': success,
-                    'action': 'uninstall',
-                    'package_name': package_name,
-                    'message': 'App uninstalled successfully' if success else 'Uninstallation failed',
-                    'timestamp': datetime.now().isoformat()
-                }
-            else:
-                # Launch system uninstaller
-                cmd = ['am', 'start', '-a', 'android.intent.action.DELETE',
-                       '-d', f'package:{package_name}']
-                await self._run_command(cmd)
-                
-                return {
-                    'success': True,
-                    'action': 'uninstall_initiated',
-                    'package_name': package_name,
-                    'message': 'Uninstallation dialog opened',
-                    'timestamp': datetime.now().isoformat()
-                }
-                
-        except Exception as e:
-            logger.error(f"Error uninstalling app: {str(e)}")
             return {
-                'success': False,
-                'error': str(e),
-                'timestamp': datetime.now().isoformat()
+                'success': success,
+                'action': 'uninstall',
+                'package_name': package_name,
+                'message': 'App uninstalled successfully' if success else 'Uninstallation failed',
+                'timestamp': iso_now()
             }
+        else:
+            # Launch system uninstaller
+            cmd = ['am', 'start', '-a', 'android.intent.action.DELETE',
+                   '-d', f'package:{package_name}']
+            await self._run_command(cmd)
+            self._invalidate_package_cache()
+            
+            return ok_response(
+                action='uninstall_initiated',
+                package_name=package_name,
+                message='Uninstallation dialog opened'
+            )
     
+    @_api_method("getting installed apps")
     async def get_installed_apps(self, filter_samsung: bool = False) -> Dict[str, Any]:
         """Get list of installed apps"""
-        try:
-            installed_apps = []
-            
-            if self.package_manager_available:
-                cmd = ['pm', 'list', 'packages', '-3']  # Third-party apps
-                result = await self._run_command(cmd)
+        installed_apps = []
+        
+        if self.package_manager_available:
+            packages = await self._get_package_cache()
+            for package_name in packages.third_party:  # Third-party apps
+                if filter_samsung and not package_name.startswith('com.samsung'):
+                    continue
                 
-                if result.stdout:
-                    packages = result.stdout.strip().split('\n')
-                    for package_line in packages:
-                        if package_line.startswith('package:'):
-                            package_name = package_line.replace('package:', '')
-                            
-                            if filter_samsung and not package_name.startswith('com.samsung'):
-                                continue
-                            
-                            app_info = {
-                                'package_name': package_name,
-                                'name': self._get_app_name_from_package(package_name),
-                                'version': await self._get_app_version(package_name)
-                            }
-                            installed_apps.append(app_info)
-            
-            return {
-                'success': True,
-                'installed_apps': installed_apps[:50],  # Limit to 50 apps
-                'total': len(installed_apps),
-                'timestamp': datetime.now().isoformat()
-            }
-            
-        except Exception as e:
-            logger.error(f"Error getting installed apps: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e),
-                'timestamp': datetime.now().isoformat()
-            }
+                app_info = {
+                    'package_name': package_name,
+                    'name': self._get_app_name_from_package(package_name),
+                    'version': packages.versions.get(package_name, '1.0.0')
+                }
+                installed_apps.append(app_info)
+        
+        # Limit to 50 apps
+        return ok_response(installed_apps=installed_apps[:50], total=len(installed_apps))
     
+    @_api_method("getting recommendations")
     async def get_app_recommendations(self, based_on: Optional[List[str]] = None) -> Dict[str, Any]:
         """Get app recommendations"""
-        try:
-            # Simulated recommendations
-            recommendations = [
-                {
-                    'package_name': 'com.samsung.android.goodlock',
-                    'name': 'Good Lock',
-                    'category': 'Personalization',
-                    'rating': 4.6,
-                    'reason': 'Popular Samsung customization app'
-                },
-                {
-                    'package_name': 'com.samsung.android.scloud',
-                    'name': 'Samsung Cloud',
-                    'category': 'Productivity',
-                    'rating': 4.2,
-                    'reason': 'Sync and backup your data'
-                },
-                {
-                    'package_name': 'com.samsung.android.app.notes',
-                    'name': 'Samsung Notes',
-                    'category': 'Productivity',
-                    'rating': 4.5,
-                    'reason': 'Advanced note-taking app'
-                },
-                {
-                    'package_name': 'com.samsung.android.oneconnect',
-                    'name': 'SmartThings',
-                    'category': 'Lifestyle',
-                    'rating': 4.3,
-                    'reason': 'Control your smart home devices'
-                },
-                {
-                    'package_name': 'com.samsung.android.bixby.agent',
-                    'name': 'Bixby',
-                    'category': 'Tools',
-                    'rating': 4.0,
-                    'reason': 'Samsung AI assistant'
-                }
-            ]
-            
-            return {
-                'success': True,
-                'recommendations': recommendations,
-                'based_on': based_on,
-                'timestamp': datetime.now().isoformat()
-            }
-            
-        except Exception as e:
-            logger.error(f"Error getting recommendations: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e),
-                'timestamp': datetime.now().isoformat()
-            }
+        # Simulated recommendations
+        recommendations = [dict(app) for app in _RECOMMENDATION_PAYLOADS]
+        
+        return ok_response(recommendations=recommendations, based_on=based_on)
     
+    @_api_method("checking updates")
     async def check_updates(self) -> Dict[str, Any]:
         """Check for app updates"""
-        try:
-            # Get installed apps
-            installed_result = await self.get_installed_apps(filter_samsung=True)
-            
-            if not installed_result['success']:
-                return installed_result
+        # Installed Samsung apps, straight from the package snapshot
+        updates_available = []
+        if self.package_manager_available:
+            packages = await self._get_package_cache()
+            samsung_apps = [name for name in packages.third_party
+                            if name.startswith('com.samsung')][:10]  # Check first 10 apps
             
             # Simulate update check
-            updates_available = []
-            for app in installed_result['installed_apps'][:10]:  # Check first 10 apps
-                # Randomly simulate some apps having updates
-                if hash(app['package_name']) % 3 == 0:
-                    updates_available.append({
-                        'package_name': app['package_name'],
-                        'name': app['name'],
-                        'current_version': app['version'],
-                        'new_version': self._increment_version(app['version']),
-                        'size': '12.5 MB'
-                    })
-            
-            return {
-                'success': True,
-                'updates_available': updates_available,
-                'total_updates': len(updates_available),
-                'timestamp': datetime.now().isoformat()
-            }
-            
-        except Exception as e:
-            logger.error(f"Error checking updates: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e),
-                'timestamp': datetime.now().isoformat()
-            }
+            updates_available = [self._build_update(name, packages.versions.get(name, '1.0.0'))
+                                 for name in samsung_apps if name in packages.updatable]
+        
+        return ok_response(
+            updates_available=updates_available,
+            total_updates=len(updates_available)
+        )
     
     async def _simulate_app_search(self, query: str, category: Optional[str], 
                                   limit: int) -> List[Dict[str, Any]]:
         """Simulate app search results"""
         # In production, this would query actual Samsung Store API
-        base_apps = [
-            {
-                'package_name': 'com.samsung.android.app.notes',
-                'name': 'Samsung Notes',
-                'category': 'Productivity',
-                'rating': 4.5,
-                'downloads': '100M+',
-                'size': '45.2 MB'
-            },
-            {
-                'package_name': 'com.samsung.android.calendar',
-                'name': 'Samsung Calendar',
-                'category': 'Productivity',
-                'rating': 4.3,
-                'downloads': '500M+',
-                'size': '32.1 MB'
-            },
-            {
-                'package_name': 'com.samsung.android.email.provider',
-                'name': 'Samsung Email',
-                'category': 'Communication',
-                'rating': 4.2,
-                'downloads': '100M+',
-                'size': '28.5 MB'
-            },
-            {
-                'package_name': 'com.samsung.android.gallery3d',
-                'name': 'Samsung Gallery',
-                'category': 'Photography',
-                'rating': 4.4,
-                'downloads': '1B+',
-                'size': '52.3 MB'
-            },
-            {
-                'package_name': 'com.samsung.android.messaging',
-                'name': 'Samsung Messages',
-                'category': 'Communication',
-                'rating': 4.1,
-                'downloads': '1B+',
-                'size': '38.7 MB'
-            }
-        ]
-        
         # Filter by query
-        results = []
         query_lower = query.lower()
-        for app in base_apps:
-            if query_lower in app['name'].lower() or query_lower in app['package_name'].lower():
-                results.append(app)
-        
-        # Filter by category if provided
-        if category:
-            results = [app for app in results if app['category'].lower() == category.lower()]
+        category_lower = category.lower() if category else None
+        results = []
+        for index in _search_candidates(query_lower):
+            name, package, app_category = _CATALOG_KEYS[index]
+            # Trigrams only narrow the rows; confirm the substring match
+            if query_lower not in name and query_lower not in package:
+                continue
+            # Filter by category if provided
+            if category_lower is not None and app_category != category_lower:
+                continue
+            results.append(_CATALOG_PAYLOADS[index])
         
-        return results[:limit]
+        return [dict(app) for app in results[:limit]]
     
     async def _is_app_installed(self, package_name: str) -> bool:
         """Check if an app is installed"""
         if self.package_manager_available:
-            cmd = ['pm', 'list', 'packages', package_name]
-            result = await self._run_command(cmd)
-            return package_name in result.stdout
+            return package_name in (await self._get_package_cache()).installed
         return False
     
     async def _get_app_version(self, package_name: str) -> Optional[str]:
         """Get installed app version"""
         if self.package_manager_available:
-            cmd = ['dumpsys', 'package', package_name]
-            result = await self._run_command(cmd)
-            
-            # Parse version from dumpsys output
-            version_match = re.search(r'versionName=(\S+)', result.stdout)
-            if version_match:
-                return version_match.group(1)
+            version = (await self._get_package_cache()).versions.get(package_name)
+            if version:
+                return version
         
         return '1.0.0'  # Default version
     
+    async def _get_package_cache(self) -> _PackageCache:
+        """Installed packages and versions, re-read after PACKAGE_CACHE_TTL seconds"""
+        now = time.monotonic()
+        if self._package_cache is None or now - self._package_cache.loaded_at >= PACKAGE_CACHE_TTL:
+            cache = await self._read_shared_package_cache(now)
+            if cache is None:
+                cache = await self._load_package_cache(now)
+                await self._write_shared_package_cache(cache)
+            self._package_cache = cache
+        return self._package_cache
+    
+    def _invalidate_package_cache(self):
+        """Forget the snapshot after we installed or removed something"""
+        self._package_cache = None
+        self._package_db_stale = True
+    
+    async def _read_shared_package_cache(self, now: float) -> Optional[_PackageCache]:
+        """A snapshot another process scanned less than PACKAGE_CACHE_TTL seconds ago"""
+        if self._package_db is None or self._package_db_stale:
+            return None
+        loop = asyncio.get_running_loop()
+        try:
+            stored = await loop.run_in_executor(None, _read_package_db, self._package_db)
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("Package cache %s unusable, not sharing snapshots: %s",
+                           self._package_db, e)
+            self._package_db = None
+            return None
+        if stored is None:
+            return None
+        
+        scanned_at, cache = stored
+        age = time.time() - scanned_at
+        if not 0 <= age < PACKAGE_CACHE_TTL:
+            return None
+        cache.loaded_at = now - age  # expire when the original scan does
+        cache.updatable = _simulated_updates(cache.third_party)
+        return cache
+    
+    async def _write_shared_package_cache(self, cache: _PackageCache):
+        """Publish a fresh scan for other processes"""
+        self._package_db_stale = False
+        if self._package_db is None:
+            return
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, _write_package_db, self._package_db,
+                                       cache, time.time())
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("Package cache %s unusable, not sharing snapshots: %s",
+                           self._package_db, e)
+            self._package_db = None
+    
+    async def _load_package_cache(self, loaded_at: float) -> _PackageCache:
+        """Read every package and version with one pm/dumpsys call each, instead of one per app"""
+        installed, third_party, dump = await asyncio.gather(
+            self._run_command(['pm', 'list', 'packages']),
+            self._run_command(['pm', 'list', 'packages', '-3']),
+            self._run_command(['dumpsys', 'package', 'packages'])
+        )
+        cache = _PackageCache(
+            loaded_at=loaded_at,
+            installed={match.group(1) for match in _PACKAGE_LINE_RE.finditer(installed.stdout)},
+            third_party=_PACKAGE_LINE_RE.findall(third_party.stdout)
+        )
+        cache.updatable = _simulated_updates(cache.third_party)
+        
+        package = None
+        for match in _DUMPSYS_PACKAGE_RE.finditer(dump.stdout):
+            if match.group(1):
+                package = match.group(1)
+            elif package is not None:
+                cache.versions.setdefault(package, match.group(2))
+        
+        if package is None and cache.third_party:
+            # Some builds reject the bulk dump; ask per app, concurrently but bounded
+            slots = asyncio.Semaphore(VERSION_LOOKUP_CONCURRENCY)
+            versions = await asyncio.gather(*(self._lookup_version(name, slots)
+                                              for name in cache.third_party))
+            cache.versions.update((name, version)
+                                  for name, version in zip(cache.third_party, versions)
+                                  if version)
+        return cache
+    
+    async def _lookup_version(self, package_name: str, slots: asyncio.Semaphore) -> Optional[str]:
+        """versionName from one package's dumpsys, holding a slot while it runs"""
+        async with slots:
+            result = await self._run_command(['dumpsys', 'package', package_name])
+        version_match = _VERSION_RE.search(result.stdout)
+        return version_match.group(1) if version_match else None
+    
     async def _launch_store_app_page(self, package_name: str):
         """Launch Samsung Store app page"""
         # Try Samsung Store first
@@ -460,12 +567,17 @@ class SamsungStoreAPI:
     
     def _get_app_name_from_package(self, package_name: str) -> str:
         """Get app name from package name"""
-        # Simple heuristic - in production, would query package info
-        parts = package_name.split('.')
-        if len(parts) > 0:
-            name = parts[-1].replace('_', ' ').title()
-            return name
-        return package_name
+        return _app_name_from_package(package_name)
+    
+    def _build_update(self, package_name: str, version: str) -> Dict[str, Any]:
+        """Simulated update entry for an installed app"""
+        return {
+            'package_name': package_name,
+            'name': self._get_app_name_from_package(package_name),
+            'current_version': version,
+            'new_version': self._increment_version(version),
+            'size': '12.5 MB'
+        }
     
     def _increment_version(self, version: Optional[str]) -> str:
         """Increment version number for simulation"""
@@ -482,25 +594,20 @@ class SamsungStoreAPI:
         
         return version + '.1'
     
-    async def _run_command(self, cmd: List[str]) -> subprocess.CompletedProcess:
+    async def _run_command(self, cmd: List[str]) -> CommandResult:
         """Run a command asynchronously"""
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        
-        stdout, stderr = await process.communicate()
-        
-        return subprocess.CompletedProcess(
-            args=cmd,
-            returncode=process.returncode,
-            stdout=stdout.decode('utf-8') if stdout else '',
-            stderr=stderr.decode('utf-8') if stderr else ''
-        )
+        # The fork/exec happens in the executor so a slow spawn can't stall the loop
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, _run_process, cmd)
     
     def get_capabilities(self) -> Dict[str, bool]:
         """Get Samsung Store API capabilities"""
+        if self._capabilities is None:
+            self._capabilities = self._build_capabilities()
+        return dict(self._capabilities)
+    
+    def _build_capabilities(self) -> Dict[str, bool]:
+        """Capabilities follow from the tools found on first use"""
         return {
             'search_apps': True,
             'app_details': True,
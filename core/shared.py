@@ -0,0 +1,38 @@
+import shutil
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+from core.clock import iso_now
+
+@lru_cache(maxsize=None)
+def which(name: str) -> Optional[str]:
+    """Absolute path of an executable on PATH, or None (looked up once per process)"""
+    return shutil.which(name)
+
+def has_binary(name: str) -> bool:
+    """Whether an executable is on PATH"""
+    return which(name) is not None
+
+@dataclass
+class CommandResult:
+    """Outcome of a command; output is only decoded when read as text"""
+    args: List[str]
+    returncode: int
+    stdout_bytes: bytes = b''
+    stderr_bytes: bytes = b''
+    
+    @property
+    def stdout(self) -> str:
+        return self.stdout_bytes.decode('utf-8', 'replace')
+    
+    @property
+    def stderr(self) -> str:
+        return self.stderr_bytes.decode('utf-8', 'replace')
+
+def ok_response(**fields) -> Dict[str, Any]:
+    """Success response carrying fields"""
+    return {'success': True, **fields, 'timestamp': iso_now()}
+
+def error_response(error, **fields) -> Dict[str, Any]:
+    """Failure response for an exception or message, plus any extra fields"""
+    return {'success': False, 'error': str(error), **fields, 'timestamp': iso_now()}
@@ -1,179 +1,387 @@
 import asyncio
 import websockets
+import itertools
 import json
 import logging
-from typing import Dict, Any, Set
-from datetime import datetime
-import uuid
+import secrets
+from collections import defaultdict, deque
+from typing import Dict, Any, Callable, Deque, List, Optional, Set, Tuple, Union
 from core.assistant_core import AssistantCore
+from core.clock import iso_now
+
+try:
+    import orjson
+except ImportError:  # optional: faster JSON (de)serialization
+    orjson = None
+
+if orjson is not None:
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so handlers stay the same
+    _loads = orjson.loads
+    
+    def _dumps(message: Dict[str, Any]) -> str:
+        """Encode a message as text, so clients keep receiving text frames"""
+        return orjson.dumps(message, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+else:
+    _loads = json.loads
+    _dumps = json.dumps
+
+try:
+    import ormsgpack
+except ImportError:  # optional: binary msgpack frames for clients that opt in
+    ormsgpack = None
+
+# Wire encodings a client may switch to with an 'encoding' message
+ENCODINGS = ('json', 'msgpack') if ormsgpack is not None else ('json',)
+# Raised for one malformed frame: bad JSON/msgpack and invalid UTF-8 are ValueErrors,
+# and json.loads gives up on deeply nested arrays with RecursionError
+_DECODE_ERRORS = (ValueError, RecursionError)
+
+def _encode(message: Dict[str, Any], binary: bool) -> Union[str, bytes]:
+    """Encode a message as a msgpack binary frame or a JSON text frame"""
+    if binary:
+        return ormsgpack.packb(message, option=ormsgpack.OPT_NON_STR_KEYS)
+    return _dumps(message)
+
+def _error_prefix(error: str) -> str:
+    """Encode an error frame up to the opening quote of its timestamp"""
+    return '{"type":"error","message":' + _dumps(error) + ',"timestamp":"'
+
+# JSON text frames whose only varying field is the timestamp, completed with iso_now() + '"}'
+_PONG_PREFIX = '{"type":"pong","timestamp":"'
+_ERROR_PREFIXES = {
+    error: _error_prefix(error)
+    for error in ('Authentication required', 'Internal server error', 'Invalid JSON format')
+}
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Sends scheduled per batch before yielding the loop during a fan-out
+FAN_OUT_BATCH_SIZE = 50
+
+# Default seconds between websocket ping control frames
+HEARTBEAT_INTERVAL = 20
+
+class ClientInfo:
+    """Connection record for one websocket client"""
+    
+    # Authentication is tracked in WebSocketServer._authed rather than per record
+    __slots__ = ('id', 'websocket', 'connected_at', 'path', 'user_id', 'events',
+                 'outbox', 'outbox_ready', 'writer')
+    
+    def __init__(self, client_id: str, websocket: websockets.WebSocketServerProtocol, path: str):
+        self.id = client_id
+        self.websocket = websocket
+        self.connected_at = iso_now()
+        self.path = path
+        self.user_id: Optional[str] = None
+        self.events: Set[str] = set()
+        # Bounded queue of broadcast/event payloads and its writer task, created on first use
+        self.outbox: Optional[Deque[Union[str, bytes]]] = None
+        self.outbox_ready: Optional[asyncio.Event] = None
+        self.writer: Optional[asyncio.Task] = None
+
 class WebSocketServer:
     """WebSocket server for real-time communication with mobile clients"""
     
-    def __init__(self, assistant_core: AssistantCore, host: str = '0.0.0.0', port: int = 8765):
+    def __init__(self, assistant_core: AssistantCore, host: str = '0.0.0.0', port: int = 8765,
+                 heartbeat_interval: Optional[float] = HEARTBEAT_INTERVAL,
+                 write_limit: Optional[int] = None, outbox_max: Optional[int] = None,
+                 reuse_port: bool = False):
         self.assistant_core = assistant_core
         self.host = host
         self.port = port
-        self.clients: Dict[str, Dict[str, Any]] = {}
-        self.active_connections: Set[websockets.WebSocketServerProtocol] = set()
+        # Seconds between protocol-level pings (and to wait for the pong); None disables them
+        self.heartbeat_interval = heartbeat_interval
+        # Per-connection write buffer (bytes) before sends wait for the socket; None keeps the library default
+        self.write_limit = write_limit
+        # Queued broadcast/event frames per client before the oldest are dropped; None sends directly
+        self.outbox_max = outbox_max
+        # Let several server processes share the port (SO_REUSEPORT); each keeps its own clients
+        self.reuse_port = reuse_port
+        self.clients: Dict[str, ClientInfo] = {}
+        self._connection_counter = itertools.count(1)
+        # Bumped whenever get_server_stats() would change; on_state_change is called after each bump
+        self.stats_version = 0
+        self.on_state_change: Optional[Callable[[], None]] = None
+        # event_type -> ids of subscribed clients; each client's 'events' set is the reverse map
+        self.subscriptions: Dict[str, Set[str]] = defaultdict(set)
+        # Encoded tail of the welcome frame, built on first connect; see invalidate_capabilities
+        self._welcome_tail: Optional[str] = None
+        # Connections that negotiated msgpack; everyone else gets JSON text frames
+        self._msgpack_clients: Set[websockets.WebSocketServerProtocol] = set()
+        # Ids of authenticated clients
+        self._authed: Set[str] = set()
         
-    async def register_client(self, websocket: websockets.WebSocketServerProtocol, path: str):
-        """Register a new client connection"""
-        client_id = str(uuid.uuid4())
-        client_info = {
-            'id': client_id,
-            'websocket': websocket,
-            'connected_at': datetime.now().isoformat(),
-            'path': path,
-            'authenticated': False,
-            'user_id': None
+        # Message type -> handler, all taking (client, message)
+        self._message_handlers = {
+            'auth': self._on_auth,
+            'request': self._on_request,
+            'ping': self._on_ping,
+            'status': self._on_status,
+            'subscribe': self._on_subscribe,
+            'encoding': self._on_encoding
         }
         
-        self.clients[client_id] = client_info
-        self.active_connections.add(websocket)
+    async def register_client(self, websocket: websockets.WebSocketServerProtocol, path: str):
+        """Register a new client connection"""
+        # Counter keeps ids unique per server; the random suffix keeps them unguessable
+        client_id = f"{next(self._connection_counter):x}-{secrets.token_hex(4)}"
+        self.clients[client_id] = ClientInfo(client_id, websocket, path)
+        self._state_changed()
         
         # Send welcome message
-        await self.send_message(websocket, {
-            'type': 'connection',
-            'status': 'connected',
-            'client_id': client_id,
-            'message': 'Welcome to Empirion AI Assistant',
-            'capabilities': self.assistant_core.get_status()['capabilities']
-        })
+        await self._send_payload(websocket, self._welcome_frame(client_id))
         
-        logger.info(f"Client {client_id} connected from {websocket.remote_address}")
+        logger.info("Client %s connected from %s", client_id, websocket.remote_address)
         return client_id
     
+    @property
+    def active_connections(self) -> Set[websockets.WebSocketServerProtocol]:
+        """Websockets of all registered clients"""
+        return {client.websocket for client in self.clients.values()}
+    
+    def _welcome_frame(self, client_id: str) -> str:
+        """Encode the welcome message, reusing the client-independent part across connects"""
+        if self._welcome_tail is None:
+            # Everything after client_id, without the opening brace
+            self._welcome_tail = _dumps({
+                'message': 'Welcome to Empirion AI Assistant',
+                'capabilities': self.assistant_core.get_status()['capabilities'],
+                'encodings': list(ENCODINGS)
+            })[1:]
+        return ('{"type":"connection","status":"connected","client_id":'
+                + _dumps(client_id) + ',' + self._welcome_tail)
+    
+    def invalidate_capabilities(self):
+        """Rebuild the welcome message on the next connect, e.g. after capabilities change"""
+        self._welcome_tail = None
+    
     async def unregister_client(self, client_id: str):
         """Unregister a client connection"""
         if client_id in self.clients:
-            websocket = self.clients[client_id]['websocket']
-            self.active_connections.discard(websocket)
-            del self.clients[client_id]
-            logger.info(f"Client {client_id} disconnected")
+            websocket = self.clients[client_id].websocket
+            self._msgpack_clients.discard(websocket)
+            self._authed.discard(client_id)
+            for event in self.clients[client_id].events:
+                subscribers = self.subscriptions.get(event)
+                if subscribers is not None:
+                    subscribers.discard(client_id)
+                    if not subscribers:
+                        del self.subscriptions[event]
+            client = self.clients.pop(client_id)
+            if client.writer is not None:
+                client.writer.cancel()
+            self._state_changed()
+            logger.info("Client %s disconnected", client_id)
+    
+    def _state_changed(self):
+        """Record a stats change and notify the listener, if any"""
+        self.stats_version += 1
+        if self.on_state_change is not None:
+            self.on_state_change()
     
     async def authenticate_client(self, client_id: str, auth_data: Dict[str, Any]) -> bool:
         """Authenticate a client"""
         # TODO: Implement actual authentication
         # For now, accept any auth attempt
         if client_id in self.clients:
-            self.clients[client_id]['authenticated'] = True
-            self.clients[client_id]['user_id'] = auth_data.get('user_id', client_id)
+            self._authed.add(client_id)
+            self.clients[client_id].user_id = auth_data.get('user_id', client_id)
+            self._state_changed()
             return True
         return False
     
     async def send_message(self, websocket: websockets.WebSocketServerProtocol, message: Dict[str, Any]):
         """Send a message to a specific client"""
+        await self._send_payload(websocket, _encode(message, websocket in self._msgpack_clients))
+    
+    async def send_error(self, websocket: websockets.WebSocketServerProtocol, error: str):
+        """Send an error message, reusing the encoded frame for JSON clients"""
+        if websocket in self._msgpack_clients:
+            await self.send_message(websocket, {'type': 'error', 'message': error, 'timestamp': iso_now()})
+            return
+        prefix = _ERROR_PREFIXES.get(error) or _error_prefix(error)
+        await self._send_payload(websocket, prefix + iso_now() + '"}')
+    
+    async def send_pong(self, websocket: websockets.WebSocketServerProtocol):
+        """Answer an application-level ping"""
+        if websocket in self._msgpack_clients:
+            await self.send_message(websocket, {'type': 'pong', 'timestamp': iso_now()})
+            return
+        await self._send_payload(websocket, _PONG_PREFIX + iso_now() + '"}')
+    
+    async def _send_payload(self, websocket: websockets.WebSocketServerProtocol,
+                            payload: Union[str, bytes]):
+        """Send an already encoded message to a specific client"""
         try:
-            await websocket.send(json.dumps(message))
+            await websocket.send(payload)
         except websockets.exceptions.ConnectionClosed:
             logger.warning("Attempted to send message to closed connection")
         except Exception as e:
-            logger.error(f"Error sending message: {str(e)}")
+            logger.error("Error sending message: %s", e)
+    
+    async def _fan_out(self, targets: List[Tuple[str, websockets.WebSocketServerProtocol]],
+                       message: Dict[str, Any]) -> List[str]:
+        """Send one message to many clients concurrently, returning the ids that failed"""
+        failed = []
+        payloads: Dict[bool, Union[str, bytes]] = {}  # encoded once per wire encoding
+        for start in range(0, len(targets), FAN_OUT_BATCH_SIZE):
+            if start:
+                await asyncio.sleep(0)  # let other tasks run between batches
+            batch = targets[start:start + FAN_OUT_BATCH_SIZE]
+            sends = []
+            for client_id, websocket in batch:
+                binary = websocket in self._msgpack_clients
+                payload = payloads.get(binary)
+                if payload is None:
+                    payload = payloads[binary] = _encode(message, binary)
+                if self.outbox_max is not None:
+                    client = self.clients.get(client_id)
+                    if client is not None:  # gone if it disconnected while we yielded
+                        self._enqueue(client, payload)
+                else:
+                    sends.append(websocket.send(payload))
+            if not sends:
+                # Queued: give the writers a turn; each reports its own failures
+                await asyncio.sleep(0)
+                continue
+            results = await asyncio.gather(*sends, return_exceptions=True)
+            for (client_id, _), result in zip(batch, results):
+                if isinstance(result, Exception):
+                    if not isinstance(result, websockets.exceptions.ConnectionClosed):
+                        logger.error("Error sending message to client %s: %s", client_id, result)
+                    failed.append(client_id)
+        return failed
+    
+    def _enqueue(self, client: ClientInfo, payload: Union[str, bytes]):
+        """Queue a payload for the client's writer, dropping the oldest queued one when full"""
+        if client.outbox is None:
+            client.outbox = deque(maxlen=self.outbox_max)
+            client.outbox_ready = asyncio.Event()
+            client.writer = asyncio.create_task(self._drain_outbox(client))
+        elif len(client.outbox) == self.outbox_max:
+            logger.debug("Outbox full for client %s, dropping oldest frame", client.id)
+        client.outbox.append(payload)
+        client.outbox_ready.set()
+    
+    async def _drain_outbox(self, client: ClientInfo):
+        """Send a client's queued payloads in order until its connection closes"""
+        while True:
+            await client.outbox_ready.wait()
+            client.outbox_ready.clear()
+            while client.outbox:
+                try:
+                    await client.websocket.send(client.outbox.popleft())
+                except websockets.exceptions.ConnectionClosed:
+                    return  # client_handler unregisters the client
+                except Exception as e:
+                    logger.error("Error sending message to client %s: %s", client.id, e)
     
     async def broadcast_message(self, message: Dict[str, Any], exclude_client: str = None):
         """Broadcast a message to all connected clients"""
-        disconnected_clients = []
+        targets = [
+            (client_id, client_info.websocket)
+            for client_id, client_info in self.clients.items()
+            if not (exclude_client and client_id == exclude_client)
+        ]
+        if not targets:
+            return
         
-        for client_id, client_info in self.clients.items():
-            if exclude_client and client_id == exclude_client:
-                continue
-                
-            try:
-                await self.send_message(client_info['websocket'], message)
-            except:
-                disconnected_clients.append(client_id)
+        disconnected_clients = await self._fan_out(targets, message)
         
         # Clean up disconnected clients
         for client_id in disconnected_clients:
             await self.unregister_client(client_id)
     
     async def handle_client_message(self, client_id: str, message: Dict[str, Any]):
-        """Handle incoming message from client"""
-        try:
-            message_type = message.get('type', 'unknown')
-            
-            if message_type == 'auth':
-                # Handle authentication
-                auth_success = await self.authenticate_client(client_id, message.get('data', {}))
-                await self.send_message(self.clients[client_id]['websocket'], {
-                    'type': 'auth_response',
-                    'success': auth_success,
-                    'timestamp': datetime.now().isoformat()
-                })
-                
-            elif message_type == 'request':
-                # Handle assistant request
-                if not self.clients[client_id]['authenticated']:
-                    await self.send_message(self.clients[client_id]['websocket'], {
-                        'type': 'error',
-                        'message': 'Authentication required',
-                        'timestamp': datetime.now().isoformat()
-                    })
-                    return
-                
-                user_id = self.clients[client_id]['user_id']
-                request_data = message.get('data', {})
-                
-                # Process request through assistant core
-                response = await self.assistant_core.process_request(user_id, request_data)
-                
-                # Send response back to client
-                await self.send_message(self.clients[client_id]['websocket'], {
-                    'type': 'response',
-                    'request_id': message.get('request_id'),
-                    'data': response,
-                    'timestamp': datetime.now().isoformat()
-                })
-                
-            elif message_type == 'ping':
-                # Handle ping/pong for connection keep-alive
-                await self.send_message(self.clients[client_id]['websocket'], {
-                    'type': 'pong',
-                    'timestamp': datetime.now().isoformat()
-                })
-                
-            elif message_type == 'status':
-                # Send assistant status
-                status = self.assistant_core.get_status()
-                await self.send_message(self.clients[client_id]['websocket'], {
-                    'type': 'status_response',
-                    'data': status,
-                    'timestamp': datetime.now().isoformat()
-                })
-                
-            elif message_type == 'subscribe':
-                # Handle event subscriptions
-                events = message.get('events', [])
-                if 'events' not in self.clients[client_id]:
-                    self.clients[client_id]['events'] = set()
-                self.clients[client_id]['events'].update(events)
-                
-                await self.send_message(self.clients[client_id]['websocket'], {
-                    'type': 'subscription_confirmed',
-                    'events': list(self.clients[client_id]['events']),
-                    'timestamp': datetime.now().isoformat()
-                })
-                
-            else:
-                # Unknown message type
-                await self.send_message(self.clients[client_id]['websocket'], {
-                    'type': 'error',
-                    'message': f'Unknown message type: {message_type}',
-                    'timestamp': datetime.now().isoformat()
-                })
-                
-        except Exception as e:
-            logger.error(f"Error handling client message: {str(e)}")
-            await self.send_message(self.clients[client_id]['websocket'], {
-                'type': 'error',
-                'message': 'Internal server error',
-                'timestamp': datetime.now().isoformat()
-            })
+        """Handle incoming message from client; client_handler reports any errors raised"""
+        client = self.clients.get(client_id)
+        if client is None:
+            return
+        
+        message_type = message.get('type', 'unknown')
+        # Non-string types from the wire (lists, objects) are unhashable and never match
+        handler = self._message_handlers.get(message_type) if isinstance(message_type, str) else None
+        if handler:
+            await handler(client, message)
+        else:
+            # Unknown message type
+            await self.send_error(client.websocket, f'Unknown message type: {message_type}')
+    
+    async def _on_auth(self, client: ClientInfo, message: Dict[str, Any]):
+        """Handle authentication"""
+        auth_success = await self.authenticate_client(client.id, message.get('data', {}))
+        await self.send_message(client.websocket, {
+            'type': 'auth_response',
+            'success': auth_success,
+            'timestamp': iso_now()
+        })
+    
+    async def _on_request(self, client: ClientInfo, message: Dict[str, Any]):
+        """Handle assistant request"""
+        if client.id not in self._authed:
+            await self.send_error(client.websocket, 'Authentication required')
+            return
+        
+        request_data = message.get('data', {})
+        
+        # Process request through assistant core
+        response = await self.assistant_core.process_request(client.user_id, request_data)
+        
+        # Send response back to client
+        await self.send_message(client.websocket, {
+            'type': 'response',
+            'request_id': message.get('request_id'),
+            'data': response,
+            'timestamp': iso_now()
+        })
+    
+    async def _on_ping(self, client: ClientInfo, message: Dict[str, Any]):
+        """Application-level keep-alive, kept for clients that cannot send protocol pings"""
+        await self.send_pong(client.websocket)
+    
+    async def _on_status(self, client: ClientInfo, message: Dict[str, Any]):
+        """Send assistant status"""
+        status = self.assistant_core.get_status()
+        await self.send_message(client.websocket, {
+            'type': 'status_response',
+            'data': status,
+            'timestamp': iso_now()
+        })
+    
+    async def _on_subscribe(self, client: ClientInfo, message: Dict[str, Any]):
+        """Handle event subscriptions"""
+        events = message.get('events', [])
+        client.events.update(events)
+        for event in events:
+            self.subscriptions[event].add(client.id)
+        self._state_changed()
+        
+        await self.send_message(client.websocket, {
+            'type': 'subscription_confirmed',
+            'events': list(client.events),
+            'timestamp': iso_now()
+        })
+    
+    async def _on_encoding(self, client: ClientInfo, message: Dict[str, Any]):
+        """Switch wire encoding; confirmed in the old encoding, later frames use the new one"""
+        websocket = client.websocket
+        encoding = message.get('encoding')
+        if encoding not in ENCODINGS:
+            await self.send_error(websocket, f'Unsupported encoding: {encoding}')
+            return
+        
+        await self.send_message(websocket, {
+            'type': 'encoding_confirmed',
+            'encoding': encoding,
+            'timestamp': iso_now()
+        })
+        if encoding == 'msgpack':
+            self._msgpack_clients.add(websocket)
+        else:
+            self._msgpack_clients.discard(websocket)
     
     async def client_handler(self, websocket: websockets.WebSocketServerProtocol):
         """Handle a client connection"""
@@ -183,21 +391,27 @@ class WebSocketServer:
         try:
             async for message in websocket:
                 try:
-                    data = json.loads(message)
-                    await self.handle_client_message(client_id, data)
-                except json.JSONDecodeError:
-                    await self.send_message(websocket, {
-                        'type': 'error',
-                        'message': 'Invalid JSON format',
-                        'timestamp': datetime.now().isoformat()
-                    })
-                except Exception as e:
-                    logger.error(f"Error processing message from client {client_id}: {str(e)}")
+                    if isinstance(message, bytes) and websocket in self._msgpack_clients:
+                        data = ormsgpack.unpackb(message)
+                    else:
+                        data = _loads(message)
+                except _DECODE_ERRORS:
+                    await self.send_error(websocket, 'Invalid JSON format')
+                    continue
+                
+                # A frame may carry a list of messages; they are handled in order, one reply each
+                for entry in (data if isinstance(data, list) else (data,)):
+                    # Kept apart from decoding: MsgpackDecodeError is ValueError, which handlers may raise
+                    try:
+                        await self.handle_client_message(client_id, entry)
+                    except Exception as e:
+                        logger.error("Error handling message from client %s: %s", client_id, e)
+                        await self.send_error(websocket, 'Internal server error')
                     
         except websockets.exceptions.ConnectionClosed:
-            logger.info(f"Client {client_id} connection closed")
+            logger.info("Client %s connection closed", client_id)
         except Exception as e:
-            logger.error(f"Unexpected error with client {client_id}: {str(e)}")
+            logger.error("Unexpected error with client %s: %s", client_id, e)
         finally:
             await self.unregister_client(client_id)
     
@@ -207,37 +421,48 @@ class WebSocketServer:
             'type': 'event',
             'event_type': event_type,
             'data': event_data,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': iso_now()
         }
         
-        for client_id, client_info in self.clients.items():
-            if 'events' in client_info and event_type in client_info['events']:
-                try:
-                    await self.send_message(client_info['websocket'], message)
-                except:
-                    logger.warning(f"Failed to send event to client {client_id}")
+        targets = [
+            (client_id, self.clients[client_id].websocket)
+            for client_id in self.subscriptions.get(event_type, ())
+        ]
+        if not targets:
+            return
+        
+        for client_id in await self._fan_out(targets, message):
+            logger.warning("Failed to send event to client %s", client_id)
     
     async def start_server(self):
         """Start the WebSocket server"""
-        logger.info(f"Starting WebSocket server on {self.host}:{self.port}")
+        logger.info("Starting WebSocket server on %s:%s", self.host, self.port)
         
-        async with websockets.serve(self.client_handler, self.host, self.port):
-            logger.info(f"WebSocket server running on ws://{self.host}:{self.port}")
+        # Keep-alive uses websocket ping/pong control frames, answered inside the library
+        serve_options = {
+            'ping_interval': self.heartbeat_interval,
+            'ping_timeout': self.heartbeat_interval
+        }
+        if self.write_limit is not None:
+            serve_options['write_limit'] = self.write_limit
+        if self.reuse_port:
+            serve_options['reuse_port'] = True
+        
+        async with websockets.serve(self.client_handler, self.host, self.port, **serve_options):
+            logger.info("WebSocket server running on ws://%s:%s", self.host, self.port)
             await asyncio.Future()  # Run forever
     
     def get_server_stats(self) -> Dict[str, Any]:
         """Get server statistics"""
-        authenticated_clients = sum(1 for c in self.clients.values() if c['authenticated'])
-        
         return {
-            'total_connections': len(self.active_connections),
-            'authenticated_clients': authenticated_clients,
+            'total_connections': len(self.clients),
+            'authenticated_clients': len(self._authed),
             'clients': [
                 {
                     'id': client_id,
-                    'authenticated': info['authenticated'],
-                    'connected_at': info['connected_at'],
-                    'subscribed_events': list(info.get('events', []))
+                    'authenticated': client_id in self._authed,
+                    'connected_at': info.connected_at,
+                    'subscribed_events': list(info.events)
                 }
                 for client_id, info in self.clients.items()
             ]
@@ -278,11 +503,30 @@ WebSocket Protocol Documentation:
    }
 
 5. Keep-Alive:
+   The server sends websocket ping control frames every heartbeat_interval
+   seconds; standard client libraries answer them automatically. Clients
+   without access to control frames may still send:
    {
        "type": "ping"
    }
 
-6. Response Format:
+   Wire encoding (optional, one of the welcome message's "encodings"):
+   {
+       "type": "encoding",
+       "encoding": "msgpack|json"
+   }
+   Confirmed in the current encoding; msgpack clients then send and
+   receive binary msgpack frames instead of JSON text frames.
+
+6. Batching:
+   Several messages may be sent in one frame as a JSON (or msgpack) array.
+   They are handled in order and each gets its own reply frame:
+   [
+       {"type": "auth", "data": {...}},
+       {"type": "request", "request_id": "unique_id", "data": {...}}
+   ]
+
+7. Response Format:
    {
        "type": "response|event|error",
        "request_id": "matching_request_id",
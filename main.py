@@ -9,13 +9,19 @@ import logging
 import argparse
 import json
 import os
+import sys
 from typing import Dict, Any
 
+try:
+    import uvloop
+except ImportError:  # optional: libuv-based event loop with faster subprocess/socket I/O
+    uvloop = None
+
 # Import core components
 from core.assistant_core import AssistantCore
-from core.websocket_server import WebSocketServer
+from core.websocket_server import WebSocketServer, HEARTBEAT_INTERVAL
 from core.phone_integration import PhoneIntegration
-from core.samsung_store_api import SamsungStoreAPI
+from core.samsung_store_api import SamsungStoreAPI, close_session
 from core.digital_assistant_api import DigitalAssistantAPI
 
 # Configure logging
@@ -25,6 +31,11 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Longest the status monitor sleeps without a reported change
+STATUS_IDLE_TIMEOUT = 300
+# Pause after a failed status check before trying again
+STATUS_ERROR_BACKOFF = 30
+
 class EmpirionAssistant:
     """Main application class for Empirion AI Assistant"""
     
@@ -32,6 +43,8 @@ class EmpirionAssistant:
         self.config = self.load_config(config_path)
         self.components = {}
         self.running = False
+        # Set by components whenever their status changes; created in start()
+        self._status_changed = None
         
     def load_config(self, config_path: str = None) -> Dict[str, Any]:
         """Load configuration from file or use defaults"""
@@ -93,7 +106,11 @@ class EmpirionAssistant:
         self.components['websocket'] = WebSocketServer(
             self.components['core'],
             host=self.config['websocket']['host'],
-            port=self.config['websocket']['port']
+            port=self.config['websocket']['port'],
+            heartbeat_interval=self.config['websocket'].get('heartbeat_interval', HEARTBEAT_INTERVAL),
+            write_limit=self.config['websocket'].get('write_limit'),
+            outbox_max=self.config['websocket'].get('outbox_max'),
+            reuse_port=self.config['websocket'].get('reuse_port', False)
         )
         
         logger.info("All components initialized successfully")
@@ -106,6 +123,11 @@ class EmpirionAssistant:
         # Initialize components
         await self.initialize_components()
         
+        # Wake the status monitor on component state changes instead of polling
+        self._status_changed = asyncio.Event()
+        for name in ('core', 'websocket'):
+            self.components[name].on_state_change = self._status_changed.set
+        
         # Create tasks for different components
         tasks = []
         
@@ -252,39 +274,66 @@ class EmpirionAssistant:
         }
     
     async def monitor_status(self):
-        """Monitor system status periodically"""
+        """Check system status whenever a component reports a change"""
+        core = self.components['core']
+        websocket = self.components['websocket']
+        seen_versions = None
         while self.running:
             try:
-                # Get status from all components
-                status = {
-                    'core': self.components['core'].get_status(),
-                    'websocket': self.components['websocket'].get_server_stats(),
-                    'timestamp': asyncio.get_event_loop().time()
-                }
-                
-                # Log active connections
-                if status['websocket']['total_connections'] > 0:
-                    logger.debug(f"Active connections: {status['websocket']['total_connections']}")
+                versions = (core.stats_version, websocket.stats_version)
+                if versions != seen_versions:
+                    seen_versions = versions
+                    self.check_status()
                 
-                # Check for any issues
-                if not status['core']['is_running']:
-                    logger.warning("Core assistant is not running!")
-                
-                await asyncio.sleep(30)  # Check every 30 seconds
+                # Sleep until something changes; the timeout is only a safety net
+                try:
+                    await asyncio.wait_for(self._status_changed.wait(), timeout=STATUS_IDLE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    pass
+                self._status_changed.clear()
                 
             except Exception as e:
                 logger.error(f"Error in status monitor: {str(e)}")
-                await asyncio.sleep(30)
+                await asyncio.sleep(STATUS_ERROR_BACKOFF)
+    
+    def check_status(self):
+        """Log the current status of all components"""
+        status = {
+            'core': self.components['core'].get_status(),
+            'websocket': self.components['websocket'].get_server_stats(),
+            'timestamp': asyncio.get_event_loop().time()
+        }
+        
+        # Log active connections
+        if status['websocket']['total_connections'] > 0:
+            logger.debug(f"Active connections: {status['websocket']['total_connections']}")
+        
+        # Check for any issues
+        if not status['core']['running']:
+            logger.warning("Core assistant is not running!")
     
     async def shutdown(self):
         """Shutdown the assistant gracefully"""
         logger.info("Shutting down Empirion AI Assistant...")
         self.running = False
+        if self._status_changed is not None:
+            self._status_changed.set()  # let the status monitor exit
         
         # Stop core assistant
         if 'core' in self.components:
             self.components['core'].stop()
         
+        # Stop phone command workers
+        if 'phone' in self.components:
+            await self.components['phone'].close()
+        
+        # Close the shared Samsung Store HTTP session
+        await close_session()
+        
+        # Stop the speech recognition worker and voice threads
+        if 'digital_assistant' in self.components:
+            await self.components['digital_assistant'].close()
+        
         # Close WebSocket connections
         if 'websocket' in self.components:
             # Send shutdown event to all clients
@@ -344,9 +393,15 @@ def main():
     if args.no_voice:
         assistant.config['voice']['enabled'] = False
     
-    # Run the assistant
+    # Run the assistant, on uvloop when it is installed
+    run_options = {}
+    if uvloop is not None:
+        if sys.version_info >= (3, 12):
+            run_options['loop_factory'] = uvloop.new_event_loop
+        else:
+            uvloop.install()  # deprecated from 3.12 in favour of loop_factory
     try:
-        asyncio.run(assistant.start())
+        asyncio.run(assistant.start(), **run_options)
     except KeyboardInterrupt:
         logger.info("Received interrupt signal")
     except Exception as e:
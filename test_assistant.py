@@ -5,74 +5,126 @@ Test script for Empirion AI Assistant
 
 import asyncio
 import json
+import sys
 import websockets
 import logging
+from contextlib import asynccontextmanager
+from functools import lru_cache
+
+try:
+    import orjson
+except ImportError:  # optional: faster JSON (de)serialization
+    orjson = None
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def dumps(obj, pretty: bool = False) -> str:
+    """Encode obj as JSON text, indented when pretty"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0).decode('utf-8')
+    return json.dumps(obj, indent=2 if pretty else None)
+
+class LazyJson:
+    """Log argument that is encoded only if a handler formats the record"""
+    
+    __slots__ = ('obj', 'pretty')
+    
+    def __init__(self, obj, pretty: bool = False):
+        self.obj = obj
+        self.pretty = pretty
+    
+    def __str__(self) -> str:
+        return dumps(self.obj, self.pretty)
+
+# Messages sent by test_websocket_connection: authentication, a test message and a quick action
+AUTH_MESSAGE = {
+    "type": "auth",
+    "data": {
+        "user_id": "test_user",
+        "token": "test_token"
+    }
+}
+TEST_MESSAGE = {
+    "type": "request",
+    "request_id": "test_001",
+    "data": {
+        "type": "text",
+        "content": "Hello, Empirion! What can you do?",
+        "metadata": {
+            "language": "en-US"
+        }
+    }
+}
+ACTION_MESSAGE = {
+    "type": "request",
+    "request_id": "test_002",
+    "data": {
+        "type": "action",
+        "content": "get_capabilities",
+        "metadata": {}
+    }
+}
+# Encoded once; the server handles a list frame entry by entry
+TEST_BATCH_FRAME = dumps([AUTH_MESSAGE, TEST_MESSAGE, ACTION_MESSAGE])
+
+# Server started by main.py or test_server.py
+WEBSOCKET_URI = "ws://localhost:8765"
+# Seconds to connect and finish the handshake; a local server answers in milliseconds
+WEBSOCKET_OPEN_TIMEOUT = 1.0
+# Largest reply frame accepted from the local server
+TEST_MAX_FRAME_SIZE = 4 * 1024 * 1024
+
+# Characters of a received frame logged at INFO; DEBUG logs the whole frame
+LOG_PREVIEW_LENGTH = 120
+
+def log_frame(label: str, frame):
+    """Log a received frame in full at DEBUG, otherwise as its length and a short prefix"""
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%s: %s", label, frame)
+    else:
+        logger.info("%s: <%d chars> %r", label, len(frame), frame[:LOG_PREVIEW_LENGTH])
+
+async def recv_batch(websocket, count):
+    """Receive the replies to a batch, one frame per message"""
+    return [await websocket.recv() for _ in range(count)]
+
+@asynccontextmanager
+async def websocket_session(uri: str = WEBSOCKET_URI):
+    """Connect once and read the welcome message; scenarios then share the connection"""
+    # Local test traffic: no per-message deflate on tiny frames, no keep-alive pings
+    async with websockets.connect(uri, compression=None, ping_interval=None,
+                                  max_size=TEST_MAX_FRAME_SIZE,
+                                  open_timeout=WEBSOCKET_OPEN_TIMEOUT) as websocket:
+        logger.info(f"Connected to {uri}")
+        
+        # Wait for connection message
+        response = await websocket.recv()
+        log_frame("Connection response", response)
+        
+        yield websocket
+
+async def scenario_batched_requests(websocket):
+    """Authenticate, send a text request and a quick action, and read the replies"""
+    # Send the pre-encoded batch in a single frame
+    await websocket.send(TEST_BATCH_FRAME)
+    logger.info("Sent authentication, test message and capabilities request")
+    
+    # Wait for the three responses, in request order
+    auth_response, message_response, capabilities_response = await recv_batch(websocket, 3)
+    log_frame("Auth response", auth_response)
+    log_frame("Message response", message_response)
+    log_frame("Capabilities", capabilities_response)
+
+# Run in order over one connection; later scenarios may rely on the auth sent by the first
+WEBSOCKET_SCENARIOS = [scenario_batched_requests]
+
 async def test_websocket_connection():
     """Test WebSocket connection and basic messaging"""
-    uri = "ws://localhost:8765"
-    
     try:
-        async with websockets.connect(uri) as websocket:
-            logger.info(f"Connected to {uri}")
-            
-            # Wait for connection message
-            response = await websocket.recv()
-            logger.info(f"Connection response: {response}")
-            
-            # Send authentication
-            auth_message = {
-                "type": "auth",
-                "data": {
-                    "user_id": "test_user",
-                    "token": "test_token"
-                }
-            }
-            await websocket.send(json.dumps(auth_message))
-            logger.info("Sent authentication")
-            
-            # Wait for auth response
-            auth_response = await websocket.recv()
-            logger.info(f"Auth response: {auth_response}")
-            
-            # Send a test message
-            test_message = {
-                "type": "request",
-                "request_id": "test_001",
-                "data": {
-                    "type": "text",
-                    "content": "Hello, Empirion! What can you do?",
-                    "metadata": {
-                        "language": "en-US"
-                    }
-                }
-            }
-            await websocket.send(json.dumps(test_message))
-            logger.info("Sent test message")
-            
-            # Wait for response
-            message_response = await websocket.recv()
-            logger.info(f"Message response: {message_response}")
-            
-            # Test quick action
-            action_message = {
-                "type": "request",
-                "request_id": "test_002",
-                "data": {
-                    "type": "action",
-                    "content": "get_capabilities",
-                    "metadata": {}
-                }
-            }
-            await websocket.send(json.dumps(action_message))
-            logger.info("Sent capabilities request")
-            
-            # Wait for response
-            capabilities_response = await websocket.recv()
-            logger.info(f"Capabilities: {capabilities_response}")
+        async with websocket_session() as websocket:
+            for scenario in WEBSOCKET_SCENARIOS:
+                await scenario(websocket)
             
             logger.info("WebSocket test completed successfully!")
             
@@ -105,16 +157,37 @@ def test_imports():
         logger.error(f"Import test failed: {str(e)}")
         return False
 
+# Component instances are built on first use and shared by every test run in the process
+
+@lru_cache(maxsize=None)
+def get_phone():
+    """Shared PhoneIntegration for the phone tests"""
+    from core.phone_integration import PhoneIntegration
+    return PhoneIntegration({"phone": {"enabled": True}})
+
+@lru_cache(maxsize=None)
+def get_store():
+    """Shared SamsungStoreAPI; enter it with async with for each use"""
+    from core.samsung_store_api import SamsungStoreAPI
+    return SamsungStoreAPI({"samsung_store": {"enabled": True}})
+
+@lru_cache(maxsize=None)
+def get_digital_assistant():
+    """Shared DigitalAssistantAPI for the assistant tests"""
+    from core.digital_assistant_api import DigitalAssistantAPI
+    return DigitalAssistantAPI({
+        "enabled": True,
+        "language": "en-US",
+        "wake_word": "hey empirion"
+    })
+
 async def test_phone_integration():
     """Test phone integration capabilities"""
-    from core.phone_integration import PhoneIntegration
-    
-    config = {"phone": {"enabled": True}}
-    phone = PhoneIntegration(config)
+    phone = get_phone()
     
     # Test capabilities
     capabilities = phone.get_capabilities()
-    logger.info(f"Phone capabilities: {json.dumps(capabilities, indent=2)}")
+    logger.info("Phone capabilities: %s", LazyJson(capabilities, pretty=True))
     
     # Test getting contacts (simulated)
     contacts = await phone.get_contacts(limit=5)
@@ -124,11 +197,8 @@ async def test_phone_integration():
 
 async def test_samsung_store():
     """Test Samsung Store API"""
-    from core.samsung_store_api import SamsungStoreAPI
-    
-    config = {"samsung_store": {"enabled": True}}
-    
-    async with SamsungStoreAPI(config) as store:
+    # The store's HTTP session is shared and stays open until release_resources()
+    async with get_store() as store:
         # Test search
         search_result = await store.search_apps("notes", limit=3)
         logger.info(f"Search test: {search_result['success']}")
@@ -139,29 +209,21 @@ async def test_samsung_store():
         
         # Test capabilities
         capabilities = store.get_capabilities()
-        logger.info(f"Store capabilities: {json.dumps(capabilities, indent=2)}")
+        logger.info("Store capabilities: %s", LazyJson(capabilities, pretty=True))
     
     return True
 
 async def test_digital_assistant():
     """Test digital assistant API"""
-    from core.digital_assistant_api import DigitalAssistantAPI
-    
-    config = {
-        "enabled": True,
-        "language": "en-US",
-        "wake_word": "hey empirion"
-    }
-    
-    assistant = DigitalAssistantAPI(config)
+    assistant = get_digital_assistant()
     
     # Test capabilities
     capabilities = assistant.get_capabilities()
-    logger.info(f"Assistant capabilities: {json.dumps(capabilities, indent=2)}")
+    logger.info("Assistant capabilities: %s", LazyJson(capabilities, pretty=True))
     
     # Test command parsing
     parsed = assistant._parse_command("Call John at 3 PM")
-    logger.info(f"Parsed command: {json.dumps(parsed, indent=2)}")
+    logger.info("Parsed command: %s", LazyJson(parsed, pretty=True))
     
     # Test TTS (without actually speaking)
     assistant.voice_enabled = False
@@ -170,6 +232,60 @@ async def test_digital_assistant():
     
     return True
 
+class FanOutSocket:
+    """In-process stand-in for a client connection; counts the frames sent to it"""
+    
+    remote_address = ('127.0.0.1', 0)
+    
+    def __init__(self, on_send=None):
+        self.sent = 0
+        self.on_send = on_send
+    
+    async def send(self, payload):
+        self.sent += 1
+        if self.on_send is not None:
+            await self.on_send()
+
+async def test_websocket_fan_out():
+    """Test a queued broadcast when a client disconnects part way through"""
+    from core.assistant_core import AssistantCore
+    from core.websocket_server import FAN_OUT_BATCH_SIZE, WebSocketServer
+    
+    server = WebSocketServer(AssistantCore({}), outbox_max=10)
+    sockets = [FanOutSocket() for _ in range(FAN_OUT_BATCH_SIZE * 2 + 20)]
+    client_ids = [await server.register_client(websocket, '/') for websocket in sockets]
+    
+    # The first client's writer runs between batches and drops a client from a later batch
+    leaving = client_ids[-1]
+    async def disconnect():
+        await server.unregister_client(leaving)
+    sockets[0].on_send = disconnect
+    
+    await server.broadcast_message({'type': 'event', 'event': 'fan_out_test'})
+    await asyncio.sleep(0)
+    assert leaving not in server.clients
+    assert all(websocket.sent == 2 for websocket in sockets[:-1])  # welcome + broadcast
+    logger.info(f"Fan-out test: {len(server.clients)} clients reached")
+    
+    for client_id in list(server.clients):
+        await server.unregister_client(client_id)
+    return True
+
+async def release_resources():
+    """Close what the shared components hold on the current event loop"""
+    from core.samsung_store_api import close_session
+    
+    # The instances stay cached; workers and the session are recreated on next use
+    await get_phone().close()
+    await close_session()
+
+async def capture_errors(test):
+    """Run a test coroutine function, returning its exception instead of raising it"""
+    try:
+        return await test()
+    except Exception as e:
+        return e
+
 async def run_all_tests():
     """Run all tests"""
     logger.info("Starting Empirion AI Assistant tests...")
@@ -181,18 +297,29 @@ async def run_all_tests():
         logger.error("Import tests failed. Please check dependencies.")
         return
     
-    # Test individual components
-    logger.info("\n2. Testing Phone Integration...")
-    await test_phone_integration()
-    
-    logger.info("\n3. Testing Samsung Store API...")
-    await test_samsung_store()
-    
-    logger.info("\n4. Testing Digital Assistant...")
-    await test_digital_assistant()
+    # Test individual components; they share no state, so run them concurrently
+    component_tests = [
+        ("Phone Integration", test_phone_integration),
+        ("Samsung Store API", test_samsung_store),
+        ("Digital Assistant", test_digital_assistant),
+        ("WebSocket Fan-out", test_websocket_fan_out),
+    ]
+    logger.info("\n2-5. Testing " + ", ".join(name for name, _ in component_tests) + "...")
+    if sys.version_info >= (3, 11):
+        async with asyncio.TaskGroup() as group:
+            tasks = [group.create_task(capture_errors(test)) for _, test in component_tests]
+        results = [task.result() for task in tasks]
+    else:
+        results = await asyncio.gather(*(capture_errors(test) for _, test in component_tests))
+    for number, ((name, _), result) in enumerate(zip(component_tests, results), start=2):
+        if isinstance(result, Exception):
+            logger.error(f"{number}. {name} test failed: {result!r}")
+        else:
+            logger.info(f"{number}. {name} test passed")
+    await release_resources()
     
     # Test WebSocket (requires server to be running)
-    logger.info("\n5. Testing WebSocket connection...")
+    logger.info("\n6. Testing WebSocket connection...")
     logger.info("Note: This requires the server to be running (python main.py)")
     # Uncomment to test when server is running
     # await test_websocket_connection()
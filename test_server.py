@@ -7,8 +7,14 @@ import asyncio
 import logging
 import json
 import os
+import sys
 from typing import Dict, Any
 
+try:
+    import uvloop
+except ImportError:  # optional: libuv-based event loop with faster subprocess/socket I/O
+    uvloop = None
+
 # Import only essential components
 from core.assistant_core import AssistantCore
 from core.websocket_server import WebSocketServer
@@ -28,7 +34,11 @@ class MinimalEmpirionAssistant:
             'openai_api_key': os.getenv('OPENAI_API_KEY', 'demo-key'),
             'websocket': {
                 'host': '0.0.0.0',
-                'port': 8765
+                'port': 8765,
+                # Let bursts of large replies buffer instead of waiting on drain
+                'write_limit': 1024 * 1024,
+                # Broadcasts queued per client before the oldest are dropped
+                'outbox_max': 1024
             }
         }
         self.components = {}
@@ -45,7 +55,9 @@ class MinimalEmpirionAssistant:
         self.components['websocket'] = WebSocketServer(
             self.components['core'],
             host=self.config['websocket']['host'],
-            port=self.config['websocket']['port']
+            port=self.config['websocket']['port'],
+            write_limit=self.config['websocket']['write_limit'],
+            outbox_max=self.config['websocket']['outbox_max']
         )
         
         logger.info(f"Starting WebSocket server on {self.config['websocket']['host']}:{self.config['websocket']['port']}")
@@ -57,8 +69,16 @@ def main():
     """Main entry point"""
     assistant = MinimalEmpirionAssistant()
     
+    # Run on uvloop when it is installed
+    run_options = {}
+    if uvloop is not None:
+        if sys.version_info >= (3, 12):
+            run_options['loop_factory'] = uvloop.new_event_loop
+        else:
+            uvloop.install()  # deprecated from 3.12 in favour of loop_factory
+    
     try:
-        asyncio.run(assistant.start())
+        asyncio.run(assistant.start(), **run_options)
     except KeyboardInterrupt:
         logger.info("Received interrupt signal")
     except Exception as e: